@@ -5,14 +5,14 @@ from sqlalchemy import select
 from app.database import get_db
 from app.core.security import decode_token
 from app.models.user import User
+from app.services.user_cache import UserPrincipal, user_principal_cache
 
 security = HTTPBearer()
 
 
-async def get_current_user(
+def get_token_payload(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+) -> dict:
     token = credentials.credentials
     payload = decode_token(token)
 
@@ -23,14 +23,58 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user_id = payload.get("sub")
-    if user_id is None:
+    if payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload",
         )
 
-    result = await db.execute(select(User).where(User.id == user_id))
+    return payload
+
+
+def check_token_version(payload: dict, token_version: int):
+    """Tokens issued before the user's last revocation are rejected"""
+    if payload.get("ver", 0) != token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def get_current_principal(
+    payload: dict = Depends(get_token_payload),
+) -> UserPrincipal:
+    """Authenticated user snapshot from the principal cache (no DB session on a hit)"""
+    principal = await user_principal_cache.get(payload["sub"])
+
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+
+    check_token_version(payload, principal.token_version)
+    return principal
+
+
+async def get_current_admin_principal(
+    current_user: UserPrincipal = Depends(get_current_principal),
+) -> UserPrincipal:
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
+
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Full ORM row, for endpoints that modify the user itself"""
+    result = await db.execute(select(User).where(User.id == payload["sub"]))
     user = result.scalar_one_or_none()
 
     if user is None:
@@ -39,6 +83,7 @@ async def get_current_user(
             detail="User not found",
         )
 
+    check_token_version(payload, user.token_version)
     return user
 
 
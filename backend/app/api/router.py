@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, posts, wallet
+from app.api.v1 import auth, posts, wallet, scan_jobs
 
 api_router = APIRouter(prefix="/api/v1")
 
 api_router.include_router(auth.router)
 api_router.include_router(posts.router)
 api_router.include_router(wallet.router)
+api_router.include_router(scan_jobs.router)
@@ -0,0 +1,151 @@
+import hashlib
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import RedirectResponse
+from app.core.file_response import ZeroCopyFileResponse
+from app.services.storage import get_storage, LocalStorage
+from app.config import settings
+
+router = APIRouter(prefix="/uploads", tags=["Uploads"])
+
+# Upload filenames are UUIDs and never change, so anything we serve can be cached forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+RENDITION_PATTERN = re.compile(r"^(?P<stem>[\w-]+_\d+w)\.(?P<ext>jpg|webp)$")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def negotiate_variant(filename: str, accept: str, exists) -> tuple[str, bool]:
+    """
+    Pick the rendition format the client prefers: WebP when Accept allows it, JPEG otherwise
+    Returns (filename to serve, whether the response varies on Accept)
+    """
+    match = RENDITION_PATTERN.match(filename)
+    if not match:
+        return filename, False
+
+    preferred = "webp" if "image/webp" in accept else "jpg"
+    candidate = f"{match.group('stem')}.{preferred}"
+    if candidate != filename and exists(candidate):
+        return candidate, True
+    return filename, True
+
+
+def make_etag(filename: str, stat_result: os.stat_result) -> str:
+    """Strong validator: files are immutable so name + size + mtime identifies the bytes"""
+    base = f"{filename}-{stat_result.st_size}-{stat_result.st_mtime_ns}"
+    return f'"{hashlib.md5(base.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+def parse_range(header: str, file_size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single "bytes=" range into (start, end) inclusive
+    Returns None for unsupported/multi-range headers (serve the full file).
+    Raises 416 if the range can't be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: last N bytes
+        length = int(last)
+        if length == 0:
+            raise_unsatisfiable(file_size)
+        start, end = max(0, file_size - length), file_size - 1
+    else:
+        start = int(first)
+        end = min(int(last), file_size - 1) if last else file_size - 1
+        if start >= file_size or start > end:
+            raise_unsatisfiable(file_size)
+
+    return start, end
+
+
+def raise_unsatisfiable(file_size: int):
+    raise HTTPException(
+        status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        detail="Requested range not satisfiable",
+        headers={"Content-Range": f"bytes */{file_size}"},
+    )
+
+
+@router.api_route("/images/{filename}", methods=["GET", "HEAD"])
+async def get_upload(filename: str, request: Request):
+    """Serve an uploaded image with immutable caching, ETag/304, byte ranges and WebP negotiation"""
+    if filename.startswith(".") or "/" in filename or "\\" in filename:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+    storage = get_storage()
+    accept = request.headers.get("accept", "")
+
+    if not isinstance(storage, LocalStorage):
+        # Remote object storage: send the client to the bucket/CDN (renditions are stored in pairs)
+        filename, varies = negotiate_variant(filename, accept, lambda candidate: True)
+        headers = {"Cache-Control": f"public, max-age={settings.SIGNED_URL_EXPIRE_SECONDS // 2}"}
+        if varies:
+            headers["Vary"] = "Accept"
+        return RedirectResponse(
+            storage.signed_url(filename),
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+            headers=headers,
+        )
+
+    filename, varies = negotiate_variant(
+        filename, accept, lambda candidate: storage.local_path(candidate) is not None
+    )
+    path = storage.local_path(filename)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    stat_result = os.stat(path)
+
+    etag = make_etag(filename, stat_result)
+    headers = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+    if varies:
+        headers["Vary"] = "Accept"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    file_size = stat_result.st_size
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = parse_range(range_header, file_size)
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+            return ZeroCopyFileResponse(
+                path,
+                file_size,
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                headers=headers,
+                media_type=media_type,
+                offset=start,
+                count=end - start + 1,
+            )
+
+    return ZeroCopyFileResponse(path, file_size, headers=headers, media_type=media_type)
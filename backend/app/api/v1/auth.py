@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database import get_db
@@ -6,14 +6,53 @@ from app.models.user import User
 from app.models.wallet import Wallet
 from app.schemas.auth import UserRegister, UserLogin, Token
 from app.schemas.user import UserResponse
-from app.core.security import verify_password, get_password_hash, create_access_token
-from app.api.deps import get_current_user
+from app.core.security import verify_password, get_password_hash, password_needs_rehash, create_access_token
+from app.core.rate_limit import SlidingWindowLimiter
+from app.services.stats_service import scam_stats
+from app.config import settings
+from app.services.user_cache import UserPrincipal
+from app.api.deps import get_current_principal, get_current_user, get_current_admin_principal
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Checked before any bcrypt work so credential-stuffing bursts are rejected cheaply.
+ip_limiter = SlidingWindowLimiter(settings.LOGIN_MAX_ATTEMPTS_PER_IP, settings.LOGIN_IP_WINDOW_SECONDS)
+account_limiter = SlidingWindowLimiter(settings.LOGIN_MAX_FAILURES_PER_ACCOUNT, settings.LOGIN_ACCOUNT_WINDOW_SECONDS)
+
+
+def check_rate_limit(limiter: SlidingWindowLimiter, key: str):
+    retry_after = limiter.retry_after(key)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def client_ip(request: Request) -> str:
+    """
+    Address the IP limiter is keyed on. Behind TRUSTED_PROXY_HOPS proxies, X-Forwarded-For
+    is read from the right past the entries they appended, so clients can't pick their own key.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    forwarded = [
+        address.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for address in header.split(",")
+        if address.strip()
+    ]
+    if hops and forwarded:
+        return forwarded[max(len(forwarded) - hops, 0)]
+    return request.client.host if request.client else "unknown"
+
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
+async def register(user_data: UserRegister, request: Request, db: AsyncSession = Depends(get_db)):
+    ip = client_ip(request)
+    check_rate_limit(ip_limiter, ip)
+    ip_limiter.hit(ip)
+
     # Check if username exists
     result = await db.execute(select(User).where(User.username == user_data.username))
     if result.scalar_one_or_none():
@@ -31,7 +70,7 @@ async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
         )
 
     # Create user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -47,28 +86,44 @@ async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
 
     await db.commit()
     await db.refresh(new_user)
+    scam_stats.record_user()
 
     return new_user
 
 
 @router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
+async def login(user_data: UserLogin, request: Request, db: AsyncSession = Depends(get_db)):
+    ip = client_ip(request)
+    account = user_data.email.lower()
+    check_rate_limit(ip_limiter, ip)
+    check_rate_limit(account_limiter, account)
+    ip_limiter.hit(ip)
+
     # Find user by email
     result = await db.execute(select(User).where(User.email == user_data.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not user or not await verify_password(user_data.password, user.hashed_password):
+        account_limiter.hit(account)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
 
+    account_limiter.reset(account)
+
+    # Upgrade hashes made with an older BCRYPT_ROUNDS while we have the plain password
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash(user_data.password)
+        await db.commit()
+
     # Create access token
     access_token = create_access_token(
         data={
             "sub": str(user.id),
             "username": user.username,
             "is_admin": user.is_admin,
+            "ver": user.token_version,
         }
     )
 
@@ -76,5 +131,37 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: UserPrincipal = Depends(get_current_principal)):
     return current_user
+
+
+async def revoke_tokens(db: AsyncSession, user: User):
+    # SQL-side increment; the ORM update also evicts the cached principal
+    user.token_version = User.token_version + 1
+    await db.commit()
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Revoke every token issued to the current user, including this one"""
+    await revoke_tokens(db, current_user)
+
+
+@router.post("/users/{user_id}/revoke-tokens", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_user_tokens(
+    user_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_admin_principal)
+):
+    """Revoke every token issued to a user (admin)"""
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    await revoke_tokens(db, user)
@@ -1,32 +1,46 @@
+import logging
 import uuid
-import os
-import base64
-import json
-import aiofiles
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, UploadFile, File, Form
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, func, and_, or_
 from sqlalchemy.orm import selectinload
 from typing import Optional
 from pydantic import BaseModel
 
-from app.database import get_db
-from app.models.user import User
+from app.database import get_db, AsyncSessionLocal, json_array_contains
 from app.models.post import Post
-from app.models.comment import Comment, Like
-from app.models.scan_result import ScanResult
+from app.models.comment import Comment
 from app.schemas.post import (
-    PostResponse, PostListResponse, CommentCreate, CommentResponse,
+    PostResponse, PostListResponse, CommentCreate, CommentResponse, CommentListResponse,
     ScanResultResponse, AnalyzeResponse
 )
-from app.schemas.user import UserPublic
-from app.api.deps import get_current_user
-from app.services.gemini_service import analyze_scam_image, calculate_scam_score, ScanResultData, generate_post_description
-from app.services.wallet_service import reward_for_report
-from app.config import settings
+from app.services.user_cache import UserPrincipal
+from app.api.deps import get_current_principal, get_current_admin_principal
+from app.core.pagination import encode_cursor, decode_cursor
+from app.services.gemini_service import calculate_scam_score, get_scan_analyzer, GeminiBusyError
+from app.services.scan_cache import scan_cache, analyze_image_cached
+from app.services.post_service import publish_post
+from app.services.comment_service import (
+    create_comment as create_post_comment, comment_page, latest_comments,
+    MAX_COMMENT_PAGE_SIZE, MAX_COMMENT_PREVIEW
+)
+from app.services.like_service import toggle_like as toggle_post_like, liked_post_ids
+from app.services.feed_cache import feed_cache, FeedPage
+from app.services.stats_service import scam_stats
+from app.services.image_ingest import (
+    stage_upload, stage_base64, prepare_renditions, discard_staged,
+    UploadTooLarge, InvalidImageData
+)
+
+logger = logging.getLogger(__name__)
+
+# Hot endpoints return ORJSONResponse with plain dicts built by post_to_dict/comment_to_dict,
+# skipping response_model re-validation; response_model stays for the OpenAPI schema.
+router = APIRouter(prefix="/posts", tags=["Posts"], default_response_class=ORJSONResponse)
 
-router = APIRouter(prefix="/posts", tags=["Posts"])
+MAX_FEED_PAGE_SIZE = 50
 
 
 def format_timestamp(dt: datetime) -> str:
@@ -44,92 +58,179 @@ def format_timestamp(dt: datetime) -> str:
         return "방금 전"
 
 
-def post_to_response(post: Post) -> PostResponse:
-    """Convert Post model to response schema"""
-    user_public = UserPublic(
-        id=post.user.id,
-        username=post.user.username,
-        avatar=post.user.avatar,
-        level=post.user.level,
-        is_verified=post.user.is_verified
-    )
+def user_to_dict(user) -> dict:
+    """UserPublic fields as a plain dict (works for User rows and UserPrincipal)"""
+    return {
+        "id": user.id,
+        "username": user.username,
+        "avatar": user.avatar,
+        "level": user.level,
+        "is_verified": user.is_verified,
+    }
+
 
-    # tags JSON 파싱
-    tags = post.tags
-    if isinstance(tags, str):
-        try:
-            tags = json.loads(tags)
-        except:
-            tags = []
-    
+def post_to_dict(post: Post, liked_by_me: bool = False) -> dict:
+    """Post row to the PostResponse JSON shape, without building pydantic models"""
     scan_result = None
     if post.scan_result:
-        # extracted_tags JSON 파싱
-        extracted_tags = post.scan_result.extracted_tags
-        if isinstance(extracted_tags, str):
-            try:
-                extracted_tags = json.loads(extracted_tags)
-            except:
-                extracted_tags = []
-        
-        scan_result = ScanResultResponse(
-            is_scam=post.scan_result.is_scam,
-            confidence_score=post.scan_result.confidence_score,
-            scam_type=post.scan_result.scam_type,
-            risk_level=post.scan_result.risk_level,
-            extracted_tags=extracted_tags or [],
-            analysis=post.scan_result.analysis or ""
-        )
+        scan_result = {
+            "is_scam": post.scan_result.is_scam,
+            "confidence_score": post.scan_result.confidence_score,
+            "scam_type": post.scan_result.scam_type,
+            "risk_level": post.scan_result.risk_level,
+            "extracted_tags": post.scan_result.extracted_tags or [],
+            "analysis": post.scan_result.analysis or "",
+        }
 
-    return PostResponse(
-        id=post.id,
-        user=user_public,
-        imageUrl=post.image_url,
-        description=post.description,
-        scamType=post.scam_type,
-        tags=tags or [],
-        timestamp=format_timestamp(post.created_at),
-        likeCount=post.like_count,
-        commentCount=post.comment_count,
-        isVerifiedScam=post.is_verified_scam,
-        scamScore=post.scam_score,
-        scanResult=scan_result
-    )
+    return {
+        "id": post.id,
+        "user": user_to_dict(post.user),
+        "imageUrl": post.image_url,
+        "imageVariants": post.image_variants or {},
+        "description": post.description,
+        "scamType": post.scam_type,
+        "tags": post.tags or [],
+        "timestamp": format_timestamp(post.created_at),
+        "likeCount": post.like_count,
+        "commentCount": post.comment_count,
+        "isVerifiedScam": post.is_verified_scam,
+        "scamScore": post.scam_score,
+        "campaignId": post.campaign_id,
+        "scanResult": scan_result,
+        "likedByMe": liked_by_me,
+        "comments": [],
+    }
 
 
-@router.get("/", response_model=PostListResponse)
-async def get_posts(
-    page: int = 1,
-    size: int = 10,
-    scam_type: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get paginated feed of posts"""
-    offset = (page - 1) * size
+def comment_to_dict(comment: Comment, user) -> dict:
+    """Comment row to the CommentResponse JSON shape"""
+    return {
+        "id": comment.id,
+        "user": user_to_dict(user),
+        "content": comment.content,
+        "timestamp": format_timestamp(comment.created_at),
+    }
+
 
+def comment_row_to_dict(row) -> dict:
+    """COMMENT_COLUMNS projection row to the CommentResponse JSON shape"""
+    return {
+        "id": row.id,
+        "user": {
+            "id": row.user_id,
+            "username": row.username,
+            "avatar": row.avatar,
+            "level": row.level,
+            "is_verified": row.is_verified,
+        },
+        "content": row.content,
+        "timestamp": format_timestamp(row.created_at),
+    }
+
+
+async def query_feed(
+    db: AsyncSession,
+    page: int,
+    size: int,
+    scam_type: Optional[str],
+    cursor: Optional[str],
+    tag: Optional[str] = None,
+    comment_preview: int = 0
+) -> dict:
+    """Feed page (PostListResponse shape) as seen by nobody in particular (likedByMe unset)"""
     query = select(Post).options(
         selectinload(Post.user),
         selectinload(Post.scan_result)
-    ).order_by(desc(Post.created_at))
+    ).order_by(desc(Post.created_at), desc(Post.id))
+
+    count_query = select(func.count(Post.id))
 
     if scam_type:
         query = query.where(Post.scam_type == scam_type)
+        count_query = count_query.where(Post.scam_type == scam_type)
+
+    if tag:
+        query = query.where(json_array_contains(Post.tags, tag))
+        count_query = count_query.where(json_array_contains(Post.tags, tag))
+
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        cursor_created_at, cursor_id = position
+        query = query.where(
+            or_(
+                Post.created_at < cursor_created_at,
+                and_(Post.created_at == cursor_created_at, Post.id < cursor_id)
+            )
+        )
+    else:
+        query = query.offset((page - 1) * size)
 
     # Get total count
-    count_result = await db.execute(select(Post))
-    total = len(count_result.scalars().all())
+    count_result = await db.execute(count_query)
+    total = count_result.scalar() or 0
 
-    # Get paginated posts
-    result = await db.execute(query.offset(offset).limit(size))
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(query.limit(size + 1))
     posts = result.scalars().all()
 
-    return PostListResponse(
-        posts=[post_to_response(p) for p in posts],
-        total=total,
-        page=page,
-        size=size
-    )
+    next_cursor = None
+    if len(posts) > size:
+        posts = posts[:size]
+        if posts:
+            last = posts[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+    items = [post_to_dict(p) for p in posts]
+    if comment_preview:
+        previews = await latest_comments(db, [p.id for p in posts], comment_preview)
+        for item in items:
+            item["comments"] = [comment_row_to_dict(row) for row in previews.get(item["id"], [])]
+
+    return {
+        "posts": items,
+        "total": total,
+        "page": page,
+        "size": size,
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/", response_model=PostListResponse)
+async def get_posts(
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=MAX_FEED_PAGE_SIZE),
+    scam_type: Optional[str] = None,
+    tag: Optional[str] = None,
+    cursor: Optional[str] = None,
+    comment_preview: int = Query(0, ge=0, le=MAX_COMMENT_PREVIEW),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_principal)
+):
+    """Get paginated feed of posts
+
+    Pass the returned `next_cursor` as `cursor` to page by (created_at, id)
+    keyset instead of offset, so deep pages cost the same as the first one.
+    The first pages come pre-serialized from the feed cache.
+    `tag` keeps posts carrying that tag (GIN-indexed containment on PostgreSQL);
+    tag-filtered pages are not cached.
+    `comment_preview=N` embeds each post's latest N comments in `comments`.
+    """
+    if tag is None and feed_cache.cacheable(page, size, cursor):
+        async def build():
+            async with AsyncSessionLocal() as build_db:
+                return await query_feed(build_db, page, size, scam_type, None, None, comment_preview)
+
+        feed_page = await feed_cache.get((scam_type or "", page, size, comment_preview), build)
+    else:
+        feed_page = FeedPage(await query_feed(db, page, size, scam_type, cursor, tag, comment_preview))
+
+    liked = await liked_post_ids(db, current_user.id, list(feed_page.post_ids))
+    return Response(content=feed_page.body_for_viewer(liked), media_type="application/json")
 
 
 @router.post("/", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
@@ -137,7 +238,7 @@ async def create_post(
     image: UploadFile = File(...),
     description: Optional[str] = Form(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Create new post with image upload and AI analysis"""
     # Validate image type
@@ -147,57 +248,19 @@ async def create_post(
             detail="Only image files are allowed"
         )
 
-    # Save image file
-    file_ext = image.filename.split(".")[-1] if "." in image.filename else "jpg"
-    filename = f"{uuid.uuid4()}.{file_ext}"
-    file_path = os.path.join(settings.UPLOAD_DIR, filename)
-
-    # Ensure upload directory exists
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-
-    # Read file content
-    content = await image.read()
-
-    # Save to disk
-    async with aiofiles.open(file_path, "wb") as f:
-        await f.write(content)
-
-    # Convert to base64 for AI analysis
-    base64_data = base64.b64encode(content).decode("utf-8")
-
-    # AI Analysis
-    scan_data: ScanResultData = await analyze_scam_image(base64_data, image.content_type)
-    scam_score = calculate_scam_score(scan_data.risk_level, scan_data.confidence_score)
-
-    # Create post
-    post = Post(
-        user_id=current_user.id,
-        image_url=f"/uploads/images/{filename}",
-        description=description,
-        scam_type=scan_data.scam_type,
-        tags=json.dumps(scan_data.extracted_tags),
-        scam_score=scam_score,
-        is_verified_scam=scan_data.is_scam and scan_data.confidence_score >= 70
-    )
-    db.add(post)
-    await db.flush()
-
-    # Create scan result
-    scan_result = ScanResult(
-        post_id=post.id,
-        is_scam=scan_data.is_scam,
-        confidence_score=scan_data.confidence_score,
-        scam_type=scan_data.scam_type,
-        risk_level=scan_data.risk_level,
-        extracted_tags=json.dumps(scan_data.extracted_tags),
-        analysis=scan_data.analysis
-    )
-    db.add(scan_result)
+    # Stream to disk in chunks, hashing on the way
+    staged = await stage_upload(image)
+    try:
+        # AI Analysis (reused if this exact image was analyzed before)
+        image_scan = await analyze_image_cached(db, staged)
 
-    # Reward points (once per day)
-    rewarded, points = await reward_for_report(db, current_user.id)
+        # Feed thumbnails/WebP renditions (process pool), then move into uploads
+        await prepare_renditions(staged, analysis=False, renditions=True)
 
-    await db.commit()
+        # Create post, scan result and reward points (once per day)
+        post, rewarded, points = await publish_post(db, current_user.id, staged, description, image_scan)
+    finally:
+        discard_staged(staged)
 
     # Reload with relationships
     result = await db.execute(
@@ -207,13 +270,14 @@ async def create_post(
     )
     post = result.scalar_one()
 
-    return post_to_response(post)
+    return ORJSONResponse(post_to_dict(post), status_code=status.HTTP_201_CREATED)
 
 
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_image(
     image: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Analyze image without creating post (preview)"""
     if not image.content_type.startswith("image/"):
@@ -222,10 +286,11 @@ async def analyze_image(
             detail="Only image files are allowed"
         )
 
-    content = await image.read()
-    base64_data = base64.b64encode(content).decode("utf-8")
-
-    scan_data = await analyze_scam_image(base64_data, image.content_type)
+    staged = await stage_upload(image)
+    try:
+        scan_data = (await analyze_image_cached(db, staged)).scan_data
+    finally:
+        discard_staged(staged)
     scam_score = calculate_scam_score(scan_data.risk_level, scan_data.confidence_score)
 
     return AnalyzeResponse(
@@ -252,18 +317,26 @@ class AnalyzeJsonRequest(BaseModel):
 async def analyze_image_json(
     request: AnalyzeJsonRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Analyze image from base64 JSON payload and auto-post if risk >= 40%"""
+    staged = None
     try:
-        print(f"[analyze-json] Starting analysis for user: {current_user.id}")
-        print(f"[analyze-json] Image data length: {len(request.image_data)}, mime_type: {request.mime_type}")
-        
-        scan_data = await analyze_scam_image(request.image_data, request.mime_type)
-        print(f"[analyze-json] Scan completed: is_scam={scan_data.is_scam}, confidence={scan_data.confidence_score}")
+        logger.debug(
+            "analyze-json: user %s, %d base64 chars, %s",
+            current_user.id, len(request.image_data), request.mime_type
+        )
         
+        # Base64 디코딩하면서 청크 단위로 디스크에 저장
+        staged = await stage_base64(request.image_data, request.mime_type)
+
+        image_scan = await analyze_image_cached(db, staged)
+        scan_data = image_scan.scan_data
         scam_score = calculate_scam_score(scan_data.risk_level, scan_data.confidence_score)
-        print(f"[analyze-json] Calculated scam_score: {scam_score}")
+        logger.debug(
+            "analyze-json: is_scam=%s confidence=%s scam_score=%s",
+            scan_data.is_scam, scan_data.confidence_score, scam_score
+        )
 
         rewarded = False
         points_earned = 0
@@ -271,56 +344,19 @@ async def analyze_image_json(
 
         # 위험도 40% 이상이면 자동으로 피드에 게시하고 포인트 지급
         if scam_score >= 40:
-            print(f"[analyze-json] Score >= 40, creating post...")
             # AI로 글 자동 작성
-            ai_description = await generate_post_description(scan_data)
-            
-            # 이미지를 파일로 저장
-            file_ext = request.mime_type.split("/")[-1] if "/" in request.mime_type else "jpg"
-            filename = f"{uuid.uuid4()}.{file_ext}"
-            file_path = os.path.join(settings.UPLOAD_DIR, filename)
-            os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-            
-            # Base64 디코딩 후 저장
-            clean_base64 = request.image_data.split(",")[1] if "," in request.image_data else request.image_data
-            image_bytes = base64.b64decode(clean_base64)
-            
-            async with aiofiles.open(file_path, "wb") as f:
-                await f.write(image_bytes)
+            ai_description = await get_scan_analyzer()[1](scan_data)
             
-            # 포스트 생성
-            post = Post(
-                user_id=current_user.id,
-                image_url=f"/uploads/images/{filename}",
-                description=ai_description,
-                scam_type=scan_data.scam_type,
-                tags=json.dumps(scan_data.extracted_tags),
-                scam_score=scam_score,
-                is_verified_scam=scan_data.is_scam and scan_data.confidence_score >= 70
-            )
-            db.add(post)
-            await db.flush()
-            
-            # 스캔 결과 저장
-            scan_result_db = ScanResult(
-                post_id=post.id,
-                is_scam=scan_data.is_scam,
-                confidence_score=scan_data.confidence_score,
-                scam_type=scan_data.scam_type,
-                risk_level=scan_data.risk_level,
-                extracted_tags=json.dumps(scan_data.extracted_tags),
-                analysis=scan_data.analysis
+            # 피드용 썸네일 생성 후 업로드 폴더로 이동
+            await prepare_renditions(staged, analysis=False, renditions=True)
+
+            # 포스트 + 스캔 결과 생성, 포인트 지급 (하루 1회)
+            post, rewarded, points_earned = await publish_post(
+                db, current_user.id, staged, ai_description, image_scan
             )
-            db.add(scan_result_db)
-            
-            # 포인트 지급 (하루 1회)
-            rewarded, points_earned = await reward_for_report(db, current_user.id)
-            
-            await db.commit()
             post_id = str(post.id)
-            print(f"[analyze-json] Post created: {post_id}, rewarded: {rewarded}")
+            logger.info("analyze-json: posted %s (scam_score %s, rewarded %s)", post_id, scam_score, rewarded)
 
-        print(f"[analyze-json] Returning response with scam_score: {scam_score}")
         return AnalyzeResponse(
             scan_result=ScanResultResponse(
                 is_scam=scan_data.is_scam,
@@ -332,27 +368,30 @@ async def analyze_image_json(
             ),
             scam_score=scam_score
         )
+    except (GeminiBusyError, UploadTooLarge, InvalidImageData):
+        raise
     except Exception as e:
-        import traceback
-        print(f"[analyze-json] ERROR: {type(e).__name__}: {e}")
-        print(f"[analyze-json] Traceback: {traceback.format_exc()}")
+        logger.exception("analyze-json failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Analysis failed: {str(e)}"
         )
+    finally:
+        if staged:
+            discard_staged(staged)
 
 
 @router.get("/{post_id}", response_model=PostResponse)
 async def get_post(
     post_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Get single post by ID"""
     result = await db.execute(
         select(Post)
         .options(selectinload(Post.user), selectinload(Post.scan_result))
-        .where(Post.id == post_id)
+        .where(Post.id == str(post_id))
     )
     post = result.scalar_one_or_none()
 
@@ -362,82 +401,61 @@ async def get_post(
             detail="Post not found"
         )
 
-    return post_to_response(post)
+    liked = await liked_post_ids(db, current_user.id, [post.id])
+    return ORJSONResponse(post_to_dict(post, post.id in liked))
 
 
 @router.post("/{post_id}/like")
 async def toggle_like(
     post_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Toggle like on a post"""
-    # Check if post exists
-    result = await db.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
+    result = await toggle_post_like(db, str(post_id), current_user.id)
 
-    if not post:
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found"
         )
 
-    # Check if already liked
-    result = await db.execute(
-        select(Like).where(
-            Like.post_id == post_id,
-            Like.user_id == current_user.id
-        )
-    )
-    existing_like = result.scalar_one_or_none()
-
-    if existing_like:
-        # Unlike
-        await db.delete(existing_like)
-        post.like_count = max(0, post.like_count - 1)
-        liked = False
-    else:
-        # Like
-        like = Like(post_id=post_id, user_id=current_user.id)
-        db.add(like)
-        post.like_count += 1
-        liked = True
-
-    await db.commit()
+    liked, like_count = result
+    feed_cache.update_post(str(post_id), likeCount=like_count)
+    return {"liked": liked, "like_count": like_count}
 
-    return {"liked": liked, "like_count": post.like_count}
 
-
-@router.get("/{post_id}/comments", response_model=list[CommentResponse])
+@router.get("/{post_id}/comments", response_model=CommentListResponse)
 async def get_comments(
     post_id: uuid.UUID,
+    size: int = Query(20, ge=1, le=MAX_COMMENT_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
-    """Get comments for a post"""
-    result = await db.execute(
-        select(Comment)
-        .options(selectinload(Comment.user))
-        .where(Comment.post_id == post_id)
-        .order_by(Comment.created_at)
-    )
-    comments = result.scalars().all()
-
-    return [
-        CommentResponse(
-            id=c.id,
-            user=UserPublic(
-                id=c.user.id,
-                username=c.user.username,
-                avatar=c.user.avatar,
-                level=c.user.level,
-                is_verified=c.user.is_verified
-            ),
-            content=c.content,
-            timestamp=format_timestamp(c.created_at)
-        )
-        for c in comments
-    ]
+    """Get comments for a post, oldest first
+
+    Pass the returned `next_cursor` as `cursor` for the following page.
+    """
+    after = None
+    if cursor:
+        after = decode_cursor(cursor)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    rows, has_more = await comment_page(db, str(post_id), size, after)
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return ORJSONResponse({
+        "comments": [comment_row_to_dict(row) for row in rows],
+        "next_cursor": next_cursor,
+    })
 
 
 @router.post("/{post_id}/comments", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
@@ -445,93 +463,73 @@ async def create_comment(
     post_id: uuid.UUID,
     comment_data: CommentCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Create comment on a post"""
-    # Check if post exists
-    result = await db.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
+    result = await create_post_comment(db, str(post_id), current_user.id, comment_data.content)
 
-    if not post:
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found"
         )
 
-    comment = Comment(
-        post_id=post_id,
-        user_id=current_user.id,
-        content=comment_data.content
-    )
-    db.add(comment)
-    post.comment_count += 1
-
-    await db.commit()
-    await db.refresh(comment)
-
-    return CommentResponse(
-        id=comment.id,
-        user=UserPublic(
-            id=current_user.id,
-            username=current_user.username,
-            avatar=current_user.avatar,
-            level=current_user.level,
-            is_verified=current_user.is_verified
-        ),
-        content=comment.content,
-        timestamp="방금 전"
-    )
+    comment, comment_count = result
+    response = comment_to_dict(comment, current_user)
+    feed_cache.comment_added(comment.post_id, response, comment_count)
+
+    return ORJSONResponse(response, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/stats/trending")
 async def get_trending_scam_types(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    window: str = Query("24h", pattern="^(1h|24h|7d)$"),
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
-    """Get trending scam types"""
-    result = await db.execute(
-        select(Post.scam_type)
-        .where(Post.scam_type.isnot(None))
-        .order_by(desc(Post.created_at))
-        .limit(100)
-    )
-    scam_types = result.scalars().all()
-
-    # Count occurrences
-    type_counts = {}
-    for st in scam_types:
-        type_counts[st] = type_counts.get(st, 0) + 1
+    """Get trending scam types over the last 1h/24h/7d
 
-    # Sort by count
-    trending = sorted(type_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-
-    return [{"type": t, "count": c} for t, c in trending]
+    Ranked by a decayed score so recent reports weigh more; `count` is the
+    plain number of reports in the window. Served from in-memory buckets.
+    """
+    return scam_stats.trending(window)
 
 
 @router.get("/stats/summary")
 async def get_stats_summary(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
+):
+    """Get overall statistics (today is the UTC day)"""
+    return {
+        **scam_stats.summary(),
+        "prevention_rate": 89  # Mock value
+    }
+
+
+@router.get("/scan-cache/stats")
+async def get_scan_cache_stats(
+    current_user: UserPrincipal = Depends(get_current_admin_principal)
 ):
-    """Get overall statistics"""
-    from sqlalchemy import func
-    from datetime import date
+    """Get scan result cache hit/miss counters (admin)"""
+    return scan_cache.stats()
 
-    today = date.today()
 
-    # Today's reports
-    today_result = await db.execute(
-        select(func.count(Post.id))
-        .where(func.date(Post.created_at) == today)
-    )
-    today_reports = today_result.scalar() or 0
+@router.delete("/scan-cache/{image_hash}", status_code=status.HTTP_204_NO_CONTENT)
+async def invalidate_scan_cache(
+    image_hash: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_admin_principal)
+):
+    """Drop the cached analysis for one image hash (admin)"""
+    if not await scan_cache.invalidate(db, image_hash.lower()):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cache entry not found"
+        )
 
-    # Total users (mock active hunters)
-    user_result = await db.execute(select(func.count(User.id)))
-    total_users = user_result.scalar() or 0
 
-    return {
-        "today_reports": today_reports,
-        "active_hunters": total_users,
-        "prevention_rate": 89  # Mock value
-    }
+@router.get("/feed-cache/stats")
+async def get_feed_cache_stats(
+    current_user: UserPrincipal = Depends(get_current_admin_principal)
+):
+    """Get feed cache hit/miss counters (admin)"""
+    return feed_cache.stats()
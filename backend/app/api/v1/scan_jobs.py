@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from typing import Optional
+
+from app.schemas.post import ScanResultResponse
+from app.schemas.scan_job import ScanJobCreate, ScanJobResponse
+from app.services.user_cache import UserPrincipal
+from app.api.deps import get_current_principal
+from app.services.scan_jobs import scan_job_queue, ScanJobData, ScanJobQueueFull
+from app.services.image_ingest import StagedImage, stage_upload, stage_base64, discard_staged
+from app.config import settings
+
+router = APIRouter(prefix="/scan-jobs", tags=["Scan Jobs"])
+
+
+def job_to_response(job: ScanJobData) -> ScanJobResponse:
+    """Convert ScanJob to response schema"""
+    scan_result = None
+    if job.scan_result:
+        scan_result = ScanResultResponse(**job.scan_result.model_dump())
+
+    return ScanJobResponse(
+        job_id=job.id,
+        status=job.status,
+        scan_result=scan_result,
+        scam_score=job.scam_score,
+        post_id=job.post_id,
+        rewarded=job.rewarded,
+        points_earned=job.points_earned,
+        error=job.error
+    )
+
+
+async def submit_job(current_user: UserPrincipal, image: StagedImage, **kwargs) -> ScanJobData:
+    try:
+        return await scan_job_queue.submit(current_user.id, image, **kwargs)
+    except ScanJobQueueFull:
+        discard_staged(image)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many pending analyses, try again later",
+            headers={"Retry-After": "5"},
+        )
+
+
+@router.post("/", response_model=ScanJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_scan_job(
+    request: ScanJobCreate,
+    current_user: UserPrincipal = Depends(get_current_principal)
+):
+    """Queue analysis of a base64 image, auto-posts if risk >= 40% (async /posts/analyze-json)"""
+    staged = await stage_base64(request.image_data, request.mime_type)
+    job = await submit_job(current_user, staged)
+    return job_to_response(job)
+
+
+@router.post("/upload", response_model=ScanJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_upload_scan_job(
+    image: UploadFile = File(...),
+    description: Optional[str] = Form(None),
+    current_user: UserPrincipal = Depends(get_current_principal)
+):
+    """Queue analysis of an uploaded image and always create a post (async POST /posts)"""
+    if not image.content_type.startswith("image/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only image files are allowed"
+        )
+
+    staged = await stage_upload(image)
+    job = await submit_job(current_user, staged, description=description, always_post=True)
+    return job_to_response(job)
+
+
+@router.get("/{job_id}", response_model=ScanJobResponse)
+async def get_scan_job(
+    job_id: str,
+    wait: int = 0,
+    current_user: UserPrincipal = Depends(get_current_principal)
+):
+    """
+    Get job status. Pass wait (seconds) to long-poll until the job finishes
+    instead of polling repeatedly.
+    """
+    # Ownership first: nobody gets to hold a long-poll on someone else's job
+    job = await scan_job_queue.get(job_id)
+    if job is None or job.user_id != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scan job not found"
+        )
+
+    wait = max(0, min(wait, settings.SCAN_JOB_MAX_WAIT_SECONDS))
+    if wait > 0 and not job.is_finished:
+        job = await scan_job_queue.wait(job_id, wait) or job
+
+    return job_to_response(job)
@@ -1,14 +1,10 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.models.user import User
-from app.schemas.wallet import WalletResponse, WalletDetailResponse, WeeklyActivityItem
-from app.api.deps import get_current_user
-from app.services.wallet_service import (
-    get_or_create_wallet,
-    check_daily_activity,
-    get_weekly_history
-)
+from app.schemas.wallet import WalletDetailResponse
+from app.services.user_cache import UserPrincipal
+from app.api.deps import get_current_principal
+from app.services.wallet_service import get_wallet_dashboard
 
 router = APIRouter(prefix="/wallet", tags=["Wallet"])
 
@@ -16,38 +12,23 @@ router = APIRouter(prefix="/wallet", tags=["Wallet"])
 @router.get("/", response_model=WalletDetailResponse)
 async def get_wallet(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Get current user's wallet info with weekly history"""
-    wallet = await get_or_create_wallet(db, current_user.id)
-
-    today_reported = await check_daily_activity(db, current_user.id, "report")
-    today_quiz = await check_daily_activity(db, current_user.id, "quiz")
-
-    history = await get_weekly_history(db, current_user.id)
-
-    return WalletDetailResponse(
-        balance=wallet.balance,
-        total_reports=wallet.total_reports,
-        total_quizzes=wallet.total_quizzes,
-        today_reported=today_reported,
-        today_quiz_completed=today_quiz,
-        history=[WeeklyActivityItem(**h) for h in history]
-    )
+    return await get_wallet_dashboard(db, current_user.id)
 
 
 @router.get("/status")
 async def get_daily_status(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Check daily activity status"""
-    today_reported = await check_daily_activity(db, current_user.id, "report")
-    today_quiz = await check_daily_activity(db, current_user.id, "quiz")
+    dashboard = await get_wallet_dashboard(db, current_user.id)
 
     return {
-        "today_reported": today_reported,
-        "today_quiz_completed": today_quiz
+        "today_reported": dashboard["today_reported"],
+        "today_quiz_completed": dashboard["today_quiz_completed"]
     }
 
 
@@ -56,7 +37,7 @@ QUIZ_REWARD_POINTS = 50
 @router.post("/quiz-reward")
 async def reward_quiz_completion(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Award points for completing daily quiz (once per day)"""
     from app.services.wallet_service import reward_for_quiz
@@ -0,0 +1,42 @@
+import time
+from collections import deque
+from typing import Hashable
+
+
+class SlidingWindowLimiter:
+    """In-process sliding window counter: at most max_events per window_seconds per key"""
+
+    def __init__(self, max_events: int, window_seconds: float, max_keys: int = 100_000):
+        self.max_events = max_events
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._events: dict[Hashable, deque] = {}
+
+    def _window(self, key: Hashable, now: float) -> deque:
+        events = self._events.get(key)
+        if events is None:
+            if len(self._events) >= self.max_keys:
+                self._prune(now)
+            events = self._events[key] = deque()
+        while events and events[0] <= now - self.window_seconds:
+            events.popleft()
+        return events
+
+    def _prune(self, now: float):
+        for key in [k for k, events in self._events.items() if not events or events[-1] <= now - self.window_seconds]:
+            del self._events[key]
+
+    def retry_after(self, key: Hashable) -> int:
+        """Seconds until key may try again, 0 if it is under the limit"""
+        now = time.monotonic()
+        events = self._window(key, now)
+        if len(events) < self.max_events:
+            return 0
+        return max(1, int(events[0] + self.window_seconds - now) + 1)
+
+    def hit(self, key: Hashable):
+        now = time.monotonic()
+        self._window(key, now).append(now)
+
+    def reset(self, key: Hashable):
+        self._events.pop(key, None)
@@ -1,24 +1,55 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+import jwt
 import bcrypt
+from app.core.cache import TTLCache
 from app.config import settings
 
+# bcrypt releases the GIL, so a few threads keep hashing off the event loop
+# without letting a login burst take every core
+_hash_pool = ThreadPoolExecutor(max_workers=settings.BCRYPT_WORKERS, thread_name_prefix="bcrypt")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         plain_password.encode('utf-8'),
         hashed_password.encode('utf-8')
     )
 
 
-def get_password_hash(password: str) -> str:
+def _hashpw(password: str) -> str:
     return bcrypt.hashpw(
         password.encode('utf-8'),
-        bcrypt.gensalt()
+        bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     ).decode('utf-8')
 
 
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_pool, _checkpw, plain_password, hashed_password
+    )
+
+
+async def get_password_hash(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_hash_pool, _hashpw, password)
+
+
+# Already-validated tokens by SHA-256 digest, each entry expiring with the token's exp
+_token_cache = TTLCache(settings.TOKEN_CACHE_MAX_ENTRIES, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the stored hash was made with a different BCRYPT_ROUNDS"""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -31,8 +62,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_token(token: str) -> Optional[dict]:
+    """Verified claims of a token, None if invalid or expired. Callers must not mutate the result."""
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(digest)
+    if payload is not None:
+        if payload["exp"] > time.time():
+            return payload
+        _token_cache.invalidate(digest)
+        return None
+
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
-    except JWTError:
+    except jwt.PyJWTError:
         return None
+
+    if "exp" in payload:
+        _token_cache.set(digest, payload, ttl_seconds=payload["exp"] - time.time())
+    return payload
@@ -1,17 +1,130 @@
+import json
+import logging
+import os
+import time
+from sqlalchemy import JSON, String, cast, event, exc, exists, func, inspect, literal, select, type_coerce
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.metrics import metrics
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-    future=True,
+# JSON column: JSONB on PostgreSQL (GIN-indexable, @> containment), JSON text on SQLite
+JSONDocument = JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+pool_wait_seconds = metrics.histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection"
 )
+pool_checkouts_total = metrics.counter("db_pool_checkouts_total", "Connections checked out of the pool")
+pool_timeouts_total = metrics.counter("db_pool_timeouts_total", "Checkouts that hit DB_POOL_TIMEOUT")
+query_seconds = metrics.histogram("db_query_seconds", "SQL statement latency by operation")
+query_errors_total = metrics.counter("db_query_errors_total", "SQL statements that raised")
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a free connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts_total.inc()
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - start)
+
+
+def _engine_options() -> dict:
+    options = {"echo": settings.DB_ECHO, "future": True}
+    if not settings.DATABASE_URL.startswith("sqlite"):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    return options
+
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options())
+
+
+def _statement_operation(statement: str) -> str:
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    if operation in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+        return operation
+    return "OTHER"
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_checkouts_total.inc()
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    query_seconds.observe(elapsed, operation=_statement_operation(statement))
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        logger.warning("Slow query (%.0fms): %s", elapsed * 1000, statement[:200])
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _on_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+    query_errors_total.inc()
+
+
+def _pool_stat(name: str):
+    def read():
+        method = getattr(engine.pool, name, None)
+        return method() if method else None
+    return read
+
+
+metrics.gauge("db_pool_size", "Configured pool size", _pool_stat("size"))
+metrics.gauge("db_pool_checked_out", "Connections currently in use", _pool_stat("checkedout"))
+metrics.gauge("db_pool_overflow", "Connections open beyond pool_size", _pool_stat("overflow"))
+
+def dialect_insert(model):
+    """INSERT construct with on_conflict_do_nothing/do_update for the configured database"""
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def json_array_contains(column, value):
+    """WHERE clause: the JSON array in `column` has `value` as an element
+
+    JSONB @> on PostgreSQL, which the GIN index on the column serves;
+    a json_each scan on SQLite.
+    """
+    if engine.dialect.name == "postgresql":
+        return type_coerce(column, postgresql.JSONB).contains(
+            cast(literal(json.dumps([value], ensure_ascii=False), String), postgresql.JSONB)
+        )
+    elements = func.json_each(column).table_valued("value")
+    return exists(select(elements.c.value).where(elements.c.value == value))
+
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -34,6 +147,29 @@ async def get_db():
             await session.close()
 
 
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+BASELINE_REVISION = "0001"
+
+
+def run_migrations(connection):
+    """Upgrade the schema to the latest Alembic revision on an existing connection"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.attributes["connection"] = connection
+    config.attributes["configure_logger"] = False
+
+    tables = inspect(connection).get_table_names()
+    if "users" in tables and "alembic_version" not in tables:
+        # Created by the old create_all bootstrap: adopt it as the baseline schema.
+        # Revisions 0002-0004 skip what that bootstrap may have created since.
+        logger.info("Stamping existing schema at revision %s", BASELINE_REVISION)
+        command.stamp(config, BASELINE_REVISION)
+
+    command.upgrade(config, "head")
+
+
 async def init_db():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
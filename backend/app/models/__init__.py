@@ -2,7 +2,9 @@ from app.models.user import User
 from app.models.post import Post
 from app.models.comment import Comment, Like
 from app.models.wallet import Wallet, WalletTransaction, DailyActivity
-from app.models.scan_result import ScanResult
+from app.models.scan_result import ScanResult, ScanResultCache
+from app.models.stats import ScamTypeBucket
+from app.models.scan_job import ScanJob
 
 __all__ = [
     "User",
@@ -13,4 +15,7 @@ __all__ = [
     "WalletTransaction",
     "DailyActivity",
     "ScanResult",
+    "ScanResultCache",
+    "ScamTypeBucket",
+    "ScanJob",
 ]
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import String, DateTime, Text, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
@@ -20,6 +20,8 @@ class Comment(Base):
     content: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_comments_post_id_created_at", "post_id", "created_at"),)
+
     # Relationships
     post = relationship("Post", back_populates="comments")
     user = relationship("User", back_populates="comments")
@@ -39,7 +41,10 @@ class Like(Base):
     )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    __table_args__ = (UniqueConstraint("post_id", "user_id", name="unique_like"),)
+    __table_args__ = (
+        UniqueConstraint("post_id", "user_id", name="unique_like"),
+        Index("ix_likes_user_id_post_id", "user_id", "post_id"),  # a viewer's liked posts
+    )
 
     # Relationships
     post = relationship("Post", back_populates="likes")
@@ -1,9 +1,8 @@
 import uuid
-import json
 from datetime import datetime
-from sqlalchemy import String, Boolean, Integer, DateTime, Text, ForeignKey
+from sqlalchemy import String, Boolean, Integer, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.database import Base
+from app.database import Base, JSONDocument
 
 
 class Post(Base):
@@ -16,18 +15,32 @@ class Post(Base):
         String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     image_url: Mapped[str] = mapped_column(String(500), nullable=False)
+    image_variants: Mapped[dict[str, str]] = mapped_column(JSONDocument, default=dict)  # {"webp_320": url, ...}
     description: Mapped[str] = mapped_column(Text, nullable=True)
     scam_type: Mapped[str] = mapped_column(String(100), nullable=True)
-    tags: Mapped[str] = mapped_column(Text, default="[]")  # JSON string for SQLite
+    tags: Mapped[list[str]] = mapped_column(JSONDocument, default=list)
     like_count: Mapped[int] = mapped_column(Integer, default=0)
     comment_count: Mapped[int] = mapped_column(Integer, default=0)
     is_verified_scam: Mapped[bool] = mapped_column(Boolean, default=False)
     scam_score: Mapped[int] = mapped_column(Integer, default=0)
+    phash: Mapped[str] = mapped_column(String(16), nullable=True)  # dHash hex, near-duplicate lookup
+    campaign_id: Mapped[str] = mapped_column(String(36), nullable=True, index=True)  # root post of a near-duplicate group
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    __table_args__ = (
+        # Feed: ORDER BY created_at DESC, id DESC (keyset cursor), optionally filtered by scam_type
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_scam_type_created_at_id", "scam_type", "created_at", "id"),
+        Index("ix_posts_user_id_created_at", "user_id", "created_at"),
+        # Tag filter: tags @> '["..."]' (jsonb_path_ops only supports containment, and is smaller for it)
+        Index(
+            "ix_posts_tags", "tags", postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # Relationships
     user = relationship("User", back_populates="posts")
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
@@ -37,12 +50,9 @@ class Post(Base):
     @property
     def tags_list(self) -> list[str]:
         """Get tags as a list"""
-        try:
-            return json.loads(self.tags) if self.tags else []
-        except:
-            return []
+        return list(self.tags or [])
 
     @tags_list.setter
     def tags_list(self, value: list[str]):
         """Set tags from a list"""
-        self.tags = json.dumps(value)
+        self.tags = list(value)
@@ -0,0 +1,27 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Boolean, Integer, DateTime, Text, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base, JSONDocument
+
+
+class ScanJob(Base):
+    """Background analysis job, shared by all workers so any of them can answer status polls"""
+    __tablename__ = "scan_jobs"
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    user_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    status: Mapped[str] = mapped_column(String(20), default="queued")  # queued, running, done, failed
+    scan_result: Mapped[Optional[dict]] = mapped_column(JSONDocument, nullable=True)  # ScanResultData
+    scam_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    post_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+    rewarded: Mapped[bool] = mapped_column(Boolean, default=False)
+    points_earned: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
@@ -1,9 +1,8 @@
 import uuid
-import json
 from datetime import datetime
 from sqlalchemy import String, Boolean, Integer, DateTime, Text, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.database import Base
+from app.database import Base, JSONDocument
 
 
 class ScanResult(Base):
@@ -19,8 +18,11 @@ class ScanResult(Base):
     confidence_score: Mapped[int] = mapped_column(Integer, nullable=False)
     scam_type: Mapped[str] = mapped_column(String(100), nullable=False)
     risk_level: Mapped[str] = mapped_column(String(20), nullable=False)  # LOW, MEDIUM, HIGH, CRITICAL
-    extracted_tags: Mapped[str] = mapped_column(Text, default="[]")  # JSON string for SQLite
+    extracted_tags: Mapped[list[str]] = mapped_column(JSONDocument, default=list)
     analysis: Mapped[str] = mapped_column(Text, nullable=True)
+    image_hash: Mapped[str] = mapped_column(String(64), nullable=True, index=True)  # SHA-256 hex
+    phash: Mapped[str] = mapped_column(String(16), nullable=True)  # dHash hex
+    is_fallback: Mapped[bool] = mapped_column(Boolean, default=False)  # placeholder/error analysis, never reused
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -29,12 +31,23 @@ class ScanResult(Base):
     @property
     def extracted_tags_list(self) -> list[str]:
         """Get extracted_tags as a list"""
-        try:
-            return json.loads(self.extracted_tags) if self.extracted_tags else []
-        except:
-            return []
+        return list(self.extracted_tags or [])
 
     @extracted_tags_list.setter
     def extracted_tags_list(self, value: list[str]):
         """Set extracted_tags from a list"""
-        self.extracted_tags = json.dumps(value)
+        self.extracted_tags = list(value)
+
+
+class ScanResultCache(Base):
+    """Analysis results keyed by the SHA-256 of the image bytes"""
+    __tablename__ = "scan_result_cache"
+
+    image_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    is_scam: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    confidence_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    scam_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    risk_level: Mapped[str] = mapped_column(String(20), nullable=False)
+    extracted_tags: Mapped[list[str]] = mapped_column(JSONDocument, default=list)
+    analysis: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class ScamTypeBucket(Base):
+    """Posts per scam_type in one time bucket (minute/hour/day), summed across workers"""
+    __tablename__ = "scam_type_buckets"
+
+    resolution: Mapped[str] = mapped_column(String(8), primary_key=True)  # minute, hour, day
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)  # UTC
+    scam_type: Mapped[str] = mapped_column(String(100), primary_key=True)  # "" for posts without one
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, date
-from sqlalchemy import String, Integer, DateTime, Date, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import String, Integer, DateTime, Date, Text, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
@@ -37,10 +37,16 @@ class WalletTransaction(Base):
         String(36), ForeignKey("wallets.id", ondelete="CASCADE"), nullable=False
     )
     amount: Mapped[int] = mapped_column(Integer, nullable=False)
-    type: Mapped[str] = mapped_column(String(50), nullable=False)  # report, quiz, social_like, social_comment, redemption
+    type: Mapped[str] = mapped_column(String(50), nullable=False)  # report, quiz, social_like, social_comment, redemption, adjustment
     description: Mapped[str] = mapped_column(Text, nullable=True)
+    idempotency_key: Mapped[str] = mapped_column(String(100), nullable=True)  # same key twice pays once
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_wallet_transactions_wallet_id_created_at", "wallet_id", "created_at"),
+        Index("ux_wallet_transactions_wallet_id_idempotency_key", "wallet_id", "idempotency_key", unique=True),
+    )
+
     # Relationships
     wallet = relationship("Wallet", back_populates="transactions")
 
@@ -59,6 +65,7 @@ class DailyActivity(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     __table_args__ = (
+        # Also serves the daily-limit lookup (user_id, activity_type, activity_date)
         UniqueConstraint("user_id", "activity_type", "activity_date", name="unique_daily_activity"),
     )
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 import uuid
 from app.schemas.user import UserPublic
@@ -31,6 +31,11 @@ class CommentResponse(BaseModel):
         from_attributes = True
 
 
+class CommentListResponse(BaseModel):
+    comments: List[CommentResponse]
+    next_cursor: Optional[str] = None
+
+
 class PostCreate(BaseModel):
     description: Optional[str] = None
 
@@ -39,6 +44,7 @@ class PostResponse(BaseModel):
     id: uuid.UUID
     user: UserPublic
     imageUrl: str
+    imageVariants: Dict[str, str] = {}  # webp_320, jpeg_320, webp_640, ...
     description: Optional[str]
     scamType: Optional[str]
     tags: List[str]
@@ -47,7 +53,10 @@ class PostResponse(BaseModel):
     commentCount: int
     isVerifiedScam: bool
     scamScore: int
+    campaignId: Optional[str] = None
     scanResult: Optional[ScanResultResponse] = None
+    likedByMe: bool = False  # viewer-specific
+    comments: List[CommentResponse] = []  # latest comments, filled with ?comment_preview=N
 
     class Config:
         from_attributes = True
@@ -58,6 +67,7 @@ class PostListResponse(BaseModel):
     total: int
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 
 class AnalyzeResponse(BaseModel):
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+from app.schemas.post import ScanResultResponse
+
+
+class ScanJobCreate(BaseModel):
+    image_data: str
+    mime_type: str
+
+
+class ScanJobResponse(BaseModel):
+    job_id: str
+    status: str
+    scan_result: Optional[ScanResultResponse] = None
+    scam_score: Optional[int] = None
+    post_id: Optional[str] = None
+    rewarded: bool = False
+    points_earned: int = 0
+    error: Optional[str] = None
@@ -0,0 +1,114 @@
+from typing import Optional, Sequence
+from sqlalchemy import select, and_, or_, func
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.comment import Comment
+from app.models.post import Post
+from app.models.user import User
+
+posts_table = Post.__table__
+
+MAX_COMMENT_PAGE_SIZE = 100
+MAX_COMMENT_PREVIEW = 5
+
+# Comment plus only the UserPublic columns of its author (no email, no password hash)
+COMMENT_COLUMNS = (
+    Comment.id,
+    Comment.post_id,
+    Comment.content,
+    Comment.created_at,
+    User.id.label("user_id"),
+    User.username,
+    User.avatar,
+    User.level,
+    User.is_verified,
+)
+
+
+async def create_comment(
+    db: AsyncSession,
+    post_id: str,
+    user_id: str,
+    content: str
+) -> Optional[tuple[Comment, int]]:
+    """
+    Bump comment_count with UPDATE ... RETURNING and insert the comment in the
+    same transaction, committed together. Returns (comment, comment_count), or
+    None if the post doesn't exist.
+    """
+    # The UPDATE also row-locks the post, so it can't be deleted under the insert
+    comment_count = await db.scalar(
+        posts_table.update()
+        .where(posts_table.c.id == post_id)
+        .values(comment_count=posts_table.c.comment_count + 1)
+        .returning(posts_table.c.comment_count)
+    )
+    if comment_count is None:
+        return None
+
+    comment = Comment(post_id=post_id, user_id=user_id, content=content)
+    db.add(comment)
+    await db.commit()
+    return comment, comment_count
+
+
+async def comment_page(
+    db: AsyncSession,
+    post_id: str,
+    size: int,
+    after: Optional[tuple]
+) -> tuple[Sequence[Row], bool]:
+    """
+    Oldest-first comments of a post, keyset-paginated on (created_at, id)
+    Returns the rows and whether another page follows.
+    """
+    query = (
+        select(*COMMENT_COLUMNS)
+        .join(User, User.id == Comment.user_id)
+        .where(Comment.post_id == post_id)
+        .order_by(Comment.created_at, Comment.id)
+    )
+    if after is not None:
+        after_created_at, after_id = after
+        query = query.where(
+            or_(
+                Comment.created_at > after_created_at,
+                and_(Comment.created_at == after_created_at, Comment.id > after_id)
+            )
+        )
+
+    # One extra row tells whether there is a next page
+    result = await db.execute(query.limit(size + 1))
+    rows = result.all()
+    return rows[:size], len(rows) > size
+
+
+def latest_comments_query(post_ids: list[str], limit: int):
+    """ROW_NUMBER() per post over (created_at, id) descending, keeping the first `limit`"""
+    position = func.row_number().over(
+        partition_by=Comment.post_id,
+        order_by=(Comment.created_at.desc(), Comment.id.desc())
+    ).label("position")
+    ranked = (
+        select(*COMMENT_COLUMNS, position)
+        .join(User, User.id == Comment.user_id)
+        .where(Comment.post_id.in_(post_ids))
+        .subquery()
+    )
+    return (
+        select(ranked)
+        .where(ranked.c.position <= limit)
+        .order_by(ranked.c.post_id, ranked.c.created_at, ranked.c.id)
+    )
+
+
+async def latest_comments(db: AsyncSession, post_ids: list[str], limit: int) -> dict[str, list[Row]]:
+    """Latest `limit` comments of each post (oldest first within a post), in one query"""
+    if not post_ids or limit <= 0:
+        return {}
+
+    result = await db.execute(latest_comments_query(post_ids, limit))
+    previews: dict[str, list[Row]] = {}
+    for row in result:
+        previews.setdefault(row.post_id, []).append(row)
+    return previews
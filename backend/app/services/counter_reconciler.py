@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import select, func, or_, text
+from app.core.metrics import metrics
+from app.database import AsyncSessionLocal, engine
+from app.models.post import Post
+from app.models.comment import Comment, Like
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+posts_table = Post.__table__
+
+# PostgreSQL advisory lock key held for a pass, so only one worker reconciles at a time
+RECONCILE_LOCK_KEY = 7_340_021
+
+counter_corrections_total = metrics.counter(
+    "post_counter_corrections_total", "Posts whose like_count/comment_count was repaired by reconciliation"
+)
+
+
+class CounterReconciler:
+    """
+    Periodically recomputes posts.like_count and comment_count from the likes
+    and comments tables. Posts are walked in id order, COUNTER_RECONCILE_BATCH_SIZE
+    at a time, each batch its own short transaction that only rewrites rows
+    that drifted, so no table lock and only brief row locks are taken.
+
+    With LIKE_WRITE_BEHIND, like_count trails the likes table by the deltas
+    buffered in every worker, which a recount can't see, so only
+    comment_count is reconciled then.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None and settings.COUNTER_RECONCILE_INTERVAL_SECONDS > 0:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Counter reconciliation every %ds", settings.COUNTER_RECONCILE_INTERVAL_SECONDS)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def reconcile(self) -> int:
+        """One full pass; returns the number of posts corrected (0 if another worker holds the pass)"""
+        async with engine.connect() as lock_conn:
+            if not await self._try_lock(lock_conn):
+                return 0
+            try:
+                return await self._reconcile_batches()
+            finally:
+                await self._unlock(lock_conn)
+
+    async def _try_lock(self, conn) -> bool:
+        if conn.dialect.name != "postgresql":
+            return True
+        result = await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": RECONCILE_LOCK_KEY})
+        await conn.commit()
+        return bool(result.scalar())
+
+    async def _unlock(self, conn):
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": RECONCILE_LOCK_KEY})
+            await conn.commit()
+
+    async def _reconcile_batches(self) -> int:
+        like_total = (
+            select(func.count()).select_from(Like)
+            .where(Like.post_id == posts_table.c.id)
+            .scalar_subquery()
+        )
+        comment_total = (
+            select(func.count()).select_from(Comment)
+            .where(Comment.post_id == posts_table.c.id)
+            .scalar_subquery()
+        )
+        drifted = posts_table.c.comment_count != comment_total
+        # A counter repair isn't an edit: keep updated_at (onupdate would bump it)
+        values = {"comment_count": comment_total, "updated_at": posts_table.c.updated_at}
+        if not settings.LIKE_WRITE_BEHIND:
+            drifted = or_(drifted, posts_table.c.like_count != like_total)
+            values["like_count"] = like_total
+
+        corrected = 0
+        last_id = ""
+        while True:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(posts_table.c.id)
+                    .where(posts_table.c.id > last_id)
+                    .order_by(posts_table.c.id)
+                    .limit(settings.COUNTER_RECONCILE_BATCH_SIZE)
+                )
+                ids = result.scalars().all()
+                if not ids:
+                    break
+                last_id = ids[-1]
+
+                result = await db.execute(
+                    posts_table.update()
+                    .where(posts_table.c.id.in_(ids), drifted)
+                    .values(**values)
+                    .returning(posts_table.c.id)
+                )
+                fixed = result.scalars().all()
+                await db.commit()
+
+            if fixed:
+                corrected += len(fixed)
+                counter_corrections_total.inc(len(fixed))
+            # Let request handlers in between batches
+            await asyncio.sleep(0)
+
+        return corrected
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.COUNTER_RECONCILE_INTERVAL_SECONDS)
+            try:
+                corrected = await self.reconcile()
+                if corrected:
+                    logger.warning("Corrected like/comment counts on %d posts", corrected)
+            except Exception as e:
+                logger.warning("Counter reconciliation failed: %s: %s", type(e).__name__, e)
+
+
+counter_reconciler = CounterReconciler()
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+import orjson
+from app.config import settings
+
+FeedKey = tuple[str, int, int, int]  # (scam_type or "", page, size, comment_preview)
+MAX_CACHED_PAGE_SIZE = 50
+
+
+class FeedPage:
+    """A viewer-neutral feed page (PostListResponse-shaped dict, likedByMe all false) and its serialized JSON"""
+
+    def __init__(self, response: dict):
+        self.response = response
+        self.post_ids = {post["id"] for post in response["posts"]}
+        self.built_at = time.monotonic()
+        self.render()
+
+    def render(self):
+        self.body = orjson.dumps(self.response)
+
+    def body_for_viewer(self, liked: set[str]) -> bytes:
+        """Serialized page with likedByMe set for the viewer; the shared bytes when nothing is liked"""
+        liked = self.post_ids & liked
+        if not liked:
+            return self.body
+
+        posts = [
+            {**post, "likedByMe": True} if post["id"] in liked else post
+            for post in self.response["posts"]
+        ]
+        return orjson.dumps({**self.response, "posts": posts})
+
+
+class FeedCache:
+    """
+    First FEED_CACHE_PAGES pages of the feed (per scam_type filter) as serialized JSON
+    Fresh for FEED_CACHE_TTL_SECONDS, then served stale for up to FEED_CACHE_STALE_SECONDS
+    while one background rebuild runs. New posts drop the affected pages; like and
+    comment counts are patched into cached pages in place.
+    """
+
+    def __init__(self):
+        self._pages: dict[FeedKey, FeedPage] = {}
+        self._building: dict[FeedKey, asyncio.Task] = {}
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def cacheable(self, page: int, size: int, cursor: Optional[str]) -> bool:
+        return cursor is None and 1 <= page <= settings.FEED_CACHE_PAGES and 1 <= size <= MAX_CACHED_PAGE_SIZE
+
+    async def get(self, key: FeedKey, build: Callable[[], Awaitable[dict]]) -> FeedPage:
+        page = self._pages.get(key)
+        if page is not None:
+            age = time.monotonic() - page.built_at
+            if age < settings.FEED_CACHE_TTL_SECONDS:
+                self.hits += 1
+                return page
+            if age < settings.FEED_CACHE_TTL_SECONDS + settings.FEED_CACHE_STALE_SECONDS:
+                self.stale_hits += 1
+                self._start_build(key, build)
+                return page
+
+        self.misses += 1
+        # Shielded: one caller going away must not cancel the build others are waiting on
+        return await asyncio.shield(self._start_build(key, build))
+
+    def _start_build(self, key: FeedKey, build) -> asyncio.Task:
+        task = self._building.get(key)
+        if task is None:
+            task = asyncio.create_task(self._build(key, build))
+            self._building[key] = task
+        return task
+
+    async def _build(self, key: FeedKey, build) -> FeedPage:
+        generation = self._generation
+        try:
+            page = FeedPage(await build())
+            # Skip storing a page that was invalidated while it was being built
+            if generation == self._generation:
+                self._pages.pop(key, None)
+                self._pages[key] = page
+                while len(self._pages) > settings.FEED_CACHE_MAX_ENTRIES:
+                    self._pages.pop(next(iter(self._pages)))
+            return page
+        finally:
+            self._building.pop(key, None)
+
+    def post_created(self, scam_type: Optional[str]):
+        """A new post shifts every page of the unfiltered feed and of its scam_type"""
+        self._generation += 1
+        for key in [k for k in self._pages if k[0] in ("", scam_type or "")]:
+            del self._pages[key]
+
+    def update_post(self, post_id: str, **fields):
+        """Patch PostResponse fields (likeCount, commentCount, ...) in every cached page showing the post"""
+        for page in self._pages.values():
+            if post_id not in page.post_ids:
+                continue
+            for post in page.response["posts"]:
+                if post["id"] == post_id:
+                    post.update(fields)
+            page.render()
+
+    def comment_added(self, post_id: str, comment: dict, comment_count: int):
+        """Bump commentCount and, on pages built with a comment preview, append to the post's comments"""
+        for key, page in self._pages.items():
+            if post_id not in page.post_ids:
+                continue
+            preview = key[3]
+            for post in page.response["posts"]:
+                if post["id"] == post_id:
+                    post["commentCount"] = comment_count
+                    if preview:
+                        post["comments"] = (post["comments"] + [comment])[-preview:]
+            page.render()
+
+    def clear(self):
+        self._generation += 1
+        self._pages.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._pages),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+
+feed_cache = FeedCache()
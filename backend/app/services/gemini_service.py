@@ -1,4 +1,8 @@
+import asyncio
 import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Optional
 from pydantic import BaseModel
 from app.config import settings
@@ -11,6 +15,52 @@ class ScanResultData(BaseModel):
     risk_level: str  # LOW, MEDIUM, HIGH, CRITICAL
     extracted_tags: list[str]
     analysis: str
+    is_fallback: bool = False  # placeholder/error result, never cached
+
+
+class GeminiBusyError(Exception):
+    """Raised when no Gemini call slot frees up within GEMINI_ACQUIRE_TIMEOUT_SECONDS"""
+
+
+# Caps in-flight Gemini calls across the process
+_gemini_semaphore = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENCY)
+
+# One thread per slot: the default executor (cpu_count + 4 threads) would queue calls
+# past that, and starve the other to_thread work (hashing, storage) behind them
+_gemini_executor = ThreadPoolExecutor(settings.GEMINI_MAX_CONCURRENCY, thread_name_prefix="gemini")
+
+
+@asynccontextmanager
+async def gemini_slot():
+    """Hold one of GEMINI_MAX_CONCURRENCY call slots, fail fast if none frees up in time"""
+    try:
+        await asyncio.wait_for(
+            _gemini_semaphore.acquire(),
+            timeout=settings.GEMINI_ACQUIRE_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        raise GeminiBusyError()
+    try:
+        yield
+    finally:
+        _gemini_semaphore.release()
+
+
+@lru_cache()
+def get_gemini_model() -> genai.GenerativeModel:
+    genai.configure(api_key=settings.GEMINI_API_KEY)
+    return genai.GenerativeModel(settings.GEMINI_MODEL)
+
+
+async def generate_content(contents):
+    """
+    Run the blocking SDK call in a worker thread so the event loop keeps
+    serving other requests while Gemini is thinking
+    """
+    async with gemini_slot():
+        return await asyncio.get_running_loop().run_in_executor(
+            _gemini_executor, get_gemini_model().generate_content, contents
+        )
 
 
 def calculate_scam_score(risk_level: str, confidence_score: int) -> int:
@@ -25,22 +75,35 @@ def calculate_scam_score(risk_level: str, confidence_score: int) -> int:
     return int(confidence_score * weight)
 
 
-async def analyze_scam_image(base64_data: str, mime_type: str) -> ScanResultData:
-    """Analyze image for potential scam content using Gemini AI"""
+def get_mock_scan_result() -> ScanResultData:
+    """Placeholder result used when Gemini is not configured"""
+    return ScanResultData(
+        is_scam=True,
+        confidence_score=75,
+        scam_type="Suspicious Content",
+        risk_level="MEDIUM",
+        extracted_tags=["Unknown", "ReviewRequired"],
+        analysis="API key not configured. This is a placeholder analysis.",
+        is_fallback=True
+    )
+
+
+async def analyze_scam_image_stub(image_bytes: bytes, mime_type: str) -> ScanResultData:
+    """Local analyzer that never calls Gemini (offline testing)"""
+    return get_mock_scan_result()
+
+
+async def generate_post_description_stub(scan_result: ScanResultData) -> str:
+    """Local description generator that never calls Gemini (offline testing)"""
+    return f"'{scan_result.scam_type}' 유형의 스캠으로 의심됩니다. 주의하세요!"
+
+
+async def analyze_scam_image(image_bytes: bytes, mime_type: str) -> ScanResultData:
+    """Analyze raw image bytes for potential scam content using Gemini AI"""
 
     if not settings.GEMINI_API_KEY or settings.GEMINI_API_KEY == "your-gemini-api-key-here":
         # Return mock result if no API key
-        return ScanResultData(
-            is_scam=True,
-            confidence_score=75,
-            scam_type="Suspicious Content",
-            risk_level="MEDIUM",
-            extracted_tags=["Unknown", "ReviewRequired"],
-            analysis="API key not configured. This is a placeholder analysis."
-        )
-
-    genai.configure(api_key=settings.GEMINI_API_KEY)
-    model = genai.GenerativeModel("gemini-2.0-flash")
+        return get_mock_scan_result()
 
     prompt = """이 이미지에서 스캠/피싱 콘텐츠가 있는지 분석해주세요.
     다음 필드를 포함한 JSON 객체로 응답해주세요:
@@ -54,14 +117,10 @@ async def analyze_scam_image(base64_data: str, mime_type: str) -> ScanResultData
     반드시 유효한 JSON만 응답하고, 마크다운 포맷팅 없이 응답하세요."""
 
     try:
-        # Remove data URL prefix if present
-        if "," in base64_data:
-            base64_data = base64_data.split(",")[1]
-
-        print(f"[Gemini] Calling API with mime_type: {mime_type}, data length: {len(base64_data)}")
+        print(f"[Gemini] Calling API with mime_type: {mime_type}, data length: {len(image_bytes)}")
         
-        response = model.generate_content([
-            {"mime_type": mime_type, "data": base64_data},
+        response = await generate_content([
+            {"mime_type": mime_type, "data": image_bytes},
             prompt
         ])
 
@@ -87,6 +146,8 @@ async def analyze_scam_image(base64_data: str, mime_type: str) -> ScanResultData
             analysis=result.get("analysis", "Analysis completed.")
         )
 
+    except GeminiBusyError:
+        raise
     except Exception as e:
         import traceback
         print(f"[Gemini] ERROR: {type(e).__name__}: {e}")
@@ -97,7 +158,8 @@ async def analyze_scam_image(base64_data: str, mime_type: str) -> ScanResultData
             scam_type="Suspicious Content",
             risk_level="MEDIUM",
             extracted_tags=["Error", "ManualReview"],
-            analysis=f"AI 분석 중 오류가 발생했습니다. 수동 검토가 필요합니다."
+            analysis=f"AI 분석 중 오류가 발생했습니다. 수동 검토가 필요합니다.",
+            is_fallback=True
         )
 
 
@@ -105,10 +167,7 @@ async def generate_post_description(scan_result: ScanResultData) -> str:
     """Generate a post description based on scan result using AI"""
     
     if not settings.GEMINI_API_KEY or settings.GEMINI_API_KEY == "your-gemini-api-key-here":
-        return f"'{scan_result.scam_type}' 유형의 스캠으로 의심됩니다. 주의하세요!"
-    
-    genai.configure(api_key=settings.GEMINI_API_KEY)
-    model = genai.GenerativeModel("gemini-2.0-flash")
+        return await generate_post_description_stub(scan_result)
     
     prompt = f"""다음 스캠 분석 결과를 바탕으로 SNS 피드에 올릴 짧은 경고 글을 작성해주세요.
 
@@ -127,7 +186,7 @@ async def generate_post_description(scan_result: ScanResultData) -> str:
 글만 작성하세요, 다른 설명 없이."""
 
     try:
-        response = model.generate_content(prompt)
+        response = await generate_content(prompt)
         description = response.text.strip()
         # 너무 길면 자르기
         if len(description) > 200:
@@ -136,3 +195,13 @@ async def generate_post_description(scan_result: ScanResultData) -> str:
     except Exception as e:
         print(f"[Gemini] Generate description error: {e}")
         return f"⚠️ '{scan_result.scam_type}' 스캠 주의! 절대 링크를 클릭하지 마세요."
+
+
+def get_scan_analyzer():
+    """
+    Return (analyze, describe) callables for the configured SCAN_ANALYZER
+    "stub" runs fully offline, anything else uses Gemini
+    """
+    if settings.SCAN_ANALYZER == "stub":
+        return analyze_scam_image_stub, generate_post_description_stub
+    return analyze_scam_image, generate_post_description
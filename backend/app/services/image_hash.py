@@ -0,0 +1,197 @@
+import asyncio
+import io
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Union
+from PIL import Image
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models.post import Post
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DHASH_SIZE = 8  # 8x8 gradient bits = 64-bit hash
+
+
+def compute_dhash(source: Union[bytes, str]) -> Optional[str]:
+    """
+    Difference hash of the image (bytes or file path) as 16 hex chars, None if it can't be decoded
+    Survives re-compression, resizing and small crops, unlike SHA-256.
+    CPU bound: call through asyncio.to_thread from request handlers.
+    """
+    try:
+        with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as img:
+            img.draft("L", (DHASH_SIZE * 4, DHASH_SIZE * 4))  # fast JPEG downscale on decode
+            pixels = list(
+                img.convert("L")
+                .resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.LANCZOS)
+                .getdata()
+            )
+    except Exception as e:
+        logger.warning("Could not decode image for hashing: %s: %s", type(e).__name__, e)
+        return None
+
+    value = 0
+    for row in range(DHASH_SIZE):
+        for col in range(DHASH_SIZE):
+            left = pixels[row * (DHASH_SIZE + 1) + col]
+            right = pixels[row * (DHASH_SIZE + 1) + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return f"{value:016x}"
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def is_distinctive(value: int) -> bool:
+    """
+    Whether a dHash carries enough gradient bits to identify an image
+    Flat and low-texture images (text on white, blank screenshots) hash to
+    nearly all zeros, so unrelated ones land within PHASH_MAX_DISTANCE of
+    each other; those are left to the exact SHA-256 match.
+    """
+    set_bits = value.bit_count()
+    return settings.PHASH_MIN_BITS <= set_bits <= DHASH_SIZE * DHASH_SIZE - settings.PHASH_MIN_BITS
+
+
+class _BKNode:
+    __slots__ = ("value", "items", "children")
+
+    def __init__(self, value: int, item: str):
+        self.value = value
+        self.items = [item]
+        self.children: dict[int, "_BKNode"] = {}
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes for sub-linear hamming radius search"""
+
+    def __init__(self):
+        self._root: Optional[_BKNode] = None
+        self.size = 0
+
+    def add(self, value: int, item: str):
+        self.size += 1
+        if self._root is None:
+            self._root = _BKNode(value, item)
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node.value)
+            if distance == 0:
+                node.items.append(item)
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKNode(value, item)
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, str]]:
+        """All (distance, item) pairs within max_distance, closest first"""
+        if self._root is None:
+            return []
+
+        matches = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node.value)
+            if distance <= max_distance:
+                matches.extend((distance, item) for item in node.items)
+            # Triangle inequality: only subtrees in [d - r, d + r] can match
+            for child_distance, child in node.children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        matches.sort(key=lambda m: m[0])
+        return matches
+
+
+class NearDuplicateIndex:
+    """
+    In-process BK-tree of post perceptual hashes, loaded from the posts table on startup
+    Each worker process has its own tree: posts created here are added on commit,
+    posts created by other workers are picked up every PHASH_INDEX_REFRESH_SECONDS.
+    Hashes that aren't distinctive are never indexed or looked up.
+    """
+
+    # Posts whose created_at predates their commit by up to this much are still picked up
+    REFRESH_OVERLAP = timedelta(minutes=5)
+
+    def __init__(self):
+        self._tree = BKTree()
+        self._post_ids: set[str] = set()
+        self._since: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.loaded = False
+
+    async def load(self, db: AsyncSession):
+        self._tree, self._post_ids = BKTree(), set()
+        self._since = datetime.utcnow()
+        await self._add_from(db, select(Post.id, Post.phash).where(Post.phash.isnot(None)))
+        self.loaded = True
+        logger.info("Loaded %d perceptual hashes", self._tree.size)
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """Add posts created since the last load/refresh (by any worker); returns how many"""
+        since, self._since = self._since, datetime.utcnow()
+        size = self._tree.size
+        await self._add_from(
+            db,
+            select(Post.id, Post.phash)
+            .where(Post.phash.isnot(None), Post.created_at >= since - self.REFRESH_OVERLAP)
+        )
+        return self._tree.size - size
+
+    async def _add_from(self, db: AsyncSession, query):
+        result = await db.execute(query)
+        for post_id, phash in result.all():
+            self.add(phash, post_id)
+
+    def add(self, phash: str, post_id: str):
+        post_id = str(post_id)
+        value = int(phash, 16)
+        if post_id in self._post_ids or not is_distinctive(value):
+            return
+        self._post_ids.add(post_id)
+        self._tree.add(value, post_id)
+
+    async def find(self, db: AsyncSession, phash: str, max_distance: int) -> list[tuple[int, str]]:
+        """(distance, post_id) of near-duplicate posts, closest first"""
+        value = int(phash, 16)
+        if not is_distinctive(value):
+            return []
+        if not self.loaded:
+            await self.load(db)
+        return self._tree.search(value, max_distance)
+
+    def start(self):
+        if self._task is None and settings.PHASH_INDEX_REFRESH_SECONDS > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.PHASH_INDEX_REFRESH_SECONDS)
+            if not self.loaded:
+                continue
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.refresh(db)
+            except Exception as e:
+                logger.warning("Near-duplicate index refresh failed: %s: %s", type(e).__name__, e)
+
+
+near_duplicate_index = NearDuplicateIndex()
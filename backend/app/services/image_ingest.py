@@ -0,0 +1,208 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import uuid
+import aiofiles
+from typing import Optional
+from fastapi import UploadFile
+from pydantic import BaseModel
+from app.services.image_processing import render_in_pool
+from app.services.storage import get_storage, public_path
+from app.config import settings
+
+CHUNK_SIZE = 64 * 1024
+BASE64_CHUNK_CHARS = CHUNK_SIZE // 3 * 4  # decodes to exactly CHUNK_SIZE bytes
+_NON_BASE64 = re.compile(r"[^A-Za-z0-9+/=]")
+
+logger = logging.getLogger(__name__)
+
+
+class UploadTooLarge(Exception):
+    """Raised when an image exceeds MAX_UPLOAD_BYTES"""
+
+
+class InvalidImageData(Exception):
+    """Raised when a base64 payload can't be decoded"""
+
+
+class StagedImage(BaseModel):
+    """Image streamed to local disk with its hash and size computed on the way"""
+    path: str
+    file_ext: str
+    mime_type: str
+    size: int
+    sha256: str
+    analysis_path: Optional[str] = None  # downscaled JPEG sent to the model
+    rendition_paths: dict[str, str] = {}  # feed renditions, e.g. webp_320
+    variant_urls: dict[str, str] = {}  # set by publish_image
+    published_keys: list[str] = []  # storage keys written by publish_image
+    published: bool = False
+
+
+def _staging_path(file_ext: str) -> str:
+    os.makedirs(settings.UPLOAD_STAGING_DIR, exist_ok=True)
+    return os.path.join(settings.UPLOAD_STAGING_DIR, f"{uuid.uuid4()}.{file_ext}.part")
+
+
+async def _stage_chunks(chunks, file_ext: str, mime_type: str) -> StagedImage:
+    """Write chunks to a staging file, hashing and enforcing MAX_UPLOAD_BYTES as they arrive"""
+    path = _staging_path(file_ext)
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    return StagedImage(
+        path=path,
+        file_ext=file_ext,
+        mime_type=mime_type,
+        size=size,
+        sha256=digest.hexdigest()
+    )
+
+
+async def stage_upload(image: UploadFile) -> StagedImage:
+    """Stream a multipart upload to disk in CHUNK_SIZE pieces"""
+    file_ext = image.filename.split(".")[-1] if image.filename and "." in image.filename else "jpg"
+
+    async def chunks():
+        while True:
+            chunk = await image.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+    return await _stage_chunks(chunks(), file_ext, image.content_type)
+
+
+async def stage_base64(image_data: str, mime_type: str) -> StagedImage:
+    """Decode a base64 (or data URL) payload to disk without building a second full copy"""
+    file_ext = mime_type.split("/")[-1] if "/" in mime_type else "jpg"
+    start = image_data.index(",") + 1 if "," in image_data else 0
+
+    line_breaks = image_data.count("\n", start) + image_data.count("\r", start)
+    if (len(image_data) - start - line_breaks) * 3 // 4 > settings.MAX_UPLOAD_BYTES + 3:
+        raise UploadTooLarge()
+
+    def decode(encoded: str) -> bytes:
+        try:
+            return base64.b64decode(encoded)
+        except binascii.Error:
+            raise InvalidImageData()
+
+    async def chunks():
+        # Line breaks (MIME-style wrapping) and other non-alphabet characters are
+        # dropped, as b64decode does for a whole string; only whole 4-character
+        # groups are decoded, the rest carries over to the next slice
+        carry = ""
+        for offset in range(start, len(image_data), BASE64_CHUNK_CHARS):
+            encoded = carry + _NON_BASE64.sub("", image_data[offset:offset + BASE64_CHUNK_CHARS])
+            whole = len(encoded) - len(encoded) % 4
+            carry = encoded[whole:]
+            if whole:
+                yield decode(encoded[:whole])
+        if carry:
+            yield decode(carry)  # incomplete final group: fails on padding
+
+    return await _stage_chunks(chunks(), file_ext, mime_type)
+
+
+async def prepare_renditions(image: StagedImage, analysis: bool = True, renditions: bool = False):
+    """Render whatever is still missing (analysis copy, feed renditions) in the process pool"""
+    analysis = analysis and image.analysis_path is None
+    renditions = renditions and not image.rendition_paths
+    if not analysis and not renditions:
+        return
+
+    output = await render_in_pool(image.path, analysis, renditions)
+    if output is None:
+        return
+    if output["analysis"]:
+        image.analysis_path = output["analysis"]
+    if output["renditions"]:
+        image.rendition_paths = output["renditions"]
+
+
+async def read_staged(image: StagedImage) -> tuple[bytes, str]:
+    """
+    Raw bytes and mime type for the model: the downscaled analysis copy when
+    there is one. This is the only full in-memory copy of the image.
+    """
+    if image.analysis_path:
+        path, mime_type = image.analysis_path, "image/jpeg"
+    else:
+        path, mime_type = image.path, image.mime_type
+
+    async with aiofiles.open(path, "rb") as f:
+        return await f.read(), mime_type
+
+
+async def publish_image(image: StagedImage) -> str:
+    """Store a staged image and its renditions in object storage, returns the public URL"""
+    storage = get_storage()
+    stem = str(uuid.uuid4())
+
+    uploads = []
+    for name, path in image.rendition_paths.items():
+        key = f"{stem}{path[path.rindex('_'):]}"
+        uploads.append(storage.put_file(key, path, mimetypes.guess_type(key)[0] or "image/jpeg"))
+        image.variant_urls[name] = public_path(key)
+        image.published_keys.append(key)
+
+    key = f"{stem}.{image.file_ext}"
+    uploads.append(storage.put_file(key, image.path, image.mime_type))
+    image.published_keys.append(key)
+
+    try:
+        await asyncio.gather(*uploads)
+    except BaseException:
+        # Some uploads may have landed before one failed
+        await unpublish_image(image)
+        raise
+    image.published = True
+    return public_path(key)
+
+
+async def unpublish_image(image: StagedImage):
+    """
+    Delete what publish_image stored, for a post that was never committed
+    Failures are logged, not raised, so the caller's own error is the one
+    that surfaces.
+    """
+    storage = get_storage()
+    for key in image.published_keys:
+        try:
+            await storage.delete(key)
+        except Exception as e:
+            logger.warning("Deleting unpublished image %s failed: %s: %s", key, type(e).__name__, e)
+
+    image.published_keys = []
+    image.variant_urls = {}
+    image.published = False
+
+
+def discard_staged(image: StagedImage):
+    """Remove staging files that were not published"""
+    paths = [image.analysis_path]
+    if not image.published:
+        paths += [image.path, *image.rendition_paths.values()]
+
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
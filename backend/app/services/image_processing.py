@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from PIL import Image, ImageOps
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_QUALITY = 85
+JPEG_QUALITY = 80
+WEBP_QUALITY = 75
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def render_image(
+    src_path: str,
+    out_prefix: str,
+    analysis_max_side: Optional[int],
+    rendition_widths: list[int]
+) -> Optional[dict]:
+    """
+    Decode once and write the analysis copy and feed renditions next to out_prefix
+    Runs inside the process pool. Returns {"analysis": path, "renditions": {name: path}},
+    or None if the image can't be decoded.
+    """
+    try:
+        with Image.open(src_path) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+
+            output = {"analysis": None, "renditions": {}}
+
+            if analysis_max_side:
+                copy = img.copy()
+                copy.thumbnail((analysis_max_side, analysis_max_side), Image.Resampling.LANCZOS)
+                path = f"{out_prefix}_analysis.jpg"
+                copy.save(path, "JPEG", quality=ANALYSIS_QUALITY, optimize=True)
+                output["analysis"] = path
+
+            for width in rendition_widths:
+                # Never upscale: small images get a single rendition at their own width
+                target = min(width, img.width)
+                height = max(1, round(img.height * target / img.width))
+                resized = img.resize((target, height), Image.Resampling.LANCZOS) if target != img.width else img
+
+                webp_path = f"{out_prefix}_{width}w.webp"
+                resized.save(webp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+                output["renditions"][f"webp_{width}"] = webp_path
+
+                jpeg_path = f"{out_prefix}_{width}w.jpg"
+                resized.save(jpeg_path, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                output["renditions"][f"jpeg_{width}"] = jpeg_path
+
+                if target == img.width:
+                    break
+
+            return output
+    except Exception as e:
+        logger.warning("Could not render %s: %s: %s", src_path, type(e).__name__, e)
+        return None
+
+
+def start_image_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_PROCESS_WORKERS)
+
+
+def shutdown_image_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def render_in_pool(
+    src_path: str,
+    analysis: bool,
+    renditions: bool
+) -> Optional[dict]:
+    """Run render_image in the process pool so decoding/resizing never blocks the event loop"""
+    start_image_pool()
+    out_prefix = os.path.splitext(os.path.splitext(src_path)[0])[0]
+    return await asyncio.get_running_loop().run_in_executor(
+        _pool,
+        render_image,
+        src_path,
+        out_prefix,
+        settings.IMAGE_ANALYSIS_MAX_SIDE if analysis else None,
+        settings.IMAGE_RENDITION_WIDTHS if renditions else []
+    )
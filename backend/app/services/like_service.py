@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, delete, literal, case, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models.post import Post
+from app.models.comment import Like
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+posts_table = Post.__table__
+
+
+class LikeCounterBuffer:
+    """
+    Write-behind like_count deltas: aggregated in memory per post and applied
+    in one batch every LIKE_FLUSH_INTERVAL_MS, so a viral post's row takes a
+    single UPDATE per interval instead of one per like.
+    """
+
+    def __init__(self):
+        self._deltas: dict[str, int] = defaultdict(int)
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Write-behind like counter started (%dms)", settings.LIKE_FLUSH_INTERVAL_MS)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def add(self, post_id: str, delta: int):
+        self._deltas[post_id] += delta
+
+    def pending(self, post_id: str) -> int:
+        return self._deltas.get(post_id, 0)
+
+    async def flush(self):
+        async with self._lock:
+            deltas = {post_id: d for post_id, d in self._deltas.items() if d}
+            self._deltas = defaultdict(int)
+            if not deltas:
+                return
+
+            new_count = posts_table.c.like_count + bindparam("delta")
+            statement = (
+                posts_table.update()
+                .where(posts_table.c.id == bindparam("post_id"))
+                .values(like_count=case((new_count < 0, 0), else_=new_count))
+            )
+            # Sorted so concurrent flushers from other workers lock rows in the same order
+            params = [{"post_id": post_id, "delta": deltas[post_id]} for post_id in sorted(deltas)]
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(statement, params)
+                    await db.commit()
+            except Exception as e:
+                logger.warning("Like count flush failed, retrying next interval: %s: %s", type(e).__name__, e)
+                for post_id, delta in deltas.items():
+                    self._deltas[post_id] += delta
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.LIKE_FLUSH_INTERVAL_MS / 1000)
+            await self.flush()
+
+
+like_counter_buffer = LikeCounterBuffer()
+
+
+async def toggle_like(db: AsyncSession, post_id: str, user_id: str) -> Optional[tuple[bool, int]]:
+    """
+    Like or unlike atomically: DELETE ... RETURNING, else INSERT ... ON CONFLICT DO NOTHING,
+    then a relative like_count update, committed together. Returns (liked, like_count),
+    or None if the post doesn't exist.
+    """
+    result = await db.execute(
+        delete(Like)
+        .where(Like.post_id == post_id, Like.user_id == user_id)
+        .returning(Like.id)
+    )
+    if result.first() is not None:
+        liked, delta = False, -1
+    else:
+        # INSERT ... SELECT from posts so a missing post inserts nothing
+        insert_like = (
+            dialect_insert(Like)
+            .from_select(
+                ["id", "post_id", "user_id", "created_at"],
+                select(
+                    literal(str(uuid.uuid4())),
+                    Post.id,
+                    literal(user_id),
+                    literal(datetime.utcnow())
+                ).where(Post.id == post_id)
+            )
+            .on_conflict_do_nothing(index_elements=["post_id", "user_id"])
+            .returning(Like.id)
+        )
+        result = await db.execute(insert_like)
+        if result.first() is None:
+            # Post is gone, or a concurrent request from the same user liked it first
+            count = await db.scalar(select(Post.like_count).where(Post.id == post_id))
+            if count is None:
+                return None
+            return True, count + like_counter_buffer.pending(post_id)
+        liked, delta = True, 1
+
+    if like_counter_buffer.enabled:
+        count = await db.scalar(select(Post.like_count).where(Post.id == post_id))
+        await db.commit()
+        # Buffered only once the like row is committed
+        like_counter_buffer.add(post_id, delta)
+        return liked, max(0, (count or 0) + like_counter_buffer.pending(post_id))
+
+    new_count = posts_table.c.like_count + delta
+    count = await db.scalar(
+        posts_table.update()
+        .where(posts_table.c.id == post_id)
+        .values(like_count=case((new_count < 0, 0), else_=new_count))
+        .returning(posts_table.c.like_count)
+    )
+    await db.commit()
+    return liked, count
+
+
+async def liked_post_ids(db: AsyncSession, user_id: str, post_ids: list[str]) -> set[str]:
+    """Which of post_ids the user has liked, in one IN (...) query"""
+    if not post_ids:
+        return set()
+    result = await db.execute(
+        select(Like.post_id).where(Like.user_id == user_id, Like.post_id.in_(post_ids))
+    )
+    return set(result.scalars().all())
@@ -0,0 +1,116 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.post import Post
+from app.models.scan_result import ScanResult
+from app.services.gemini_service import calculate_scam_score
+from app.services.scan_cache import ImageScan
+from app.services.image_ingest import StagedImage, publish_image, unpublish_image
+from app.services.image_hash import near_duplicate_index
+from app.services.feed_cache import feed_cache
+from app.services.stats_service import scam_stats
+from app.services.wallet_service import reward_for_report
+
+
+async def resolve_campaign(db: AsyncSession, duplicate_of: Optional[str]) -> Optional[str]:
+    """Campaign id for a post that near-duplicates duplicate_of, starting one at that post if needed"""
+    if not duplicate_of:
+        return None
+
+    original = await db.get(Post, duplicate_of)
+    if original is None:
+        return None
+
+    if original.campaign_id is None:
+        original.campaign_id = original.id
+    return original.campaign_id
+
+
+async def create_post_with_scan(
+    db: AsyncSession,
+    user_id,
+    image_url: str,
+    description: Optional[str],
+    image_scan: ImageScan,
+    image_variants: Optional[dict[str, str]] = None
+) -> tuple[Post, bool, int]:
+    """
+    Create post and its scan result, then give the daily report reward
+    Near-duplicates of an earlier post join that post's campaign.
+    Returns (post, rewarded, points_earned). The caller commits.
+    """
+    scan_data = image_scan.scan_data
+    campaign_id = await resolve_campaign(db, image_scan.duplicate_of)
+    scam_score = calculate_scam_score(scan_data.risk_level, scan_data.confidence_score)
+
+    post = Post(
+        user_id=user_id,
+        image_url=image_url,
+        image_variants=dict(image_variants or {}),
+        description=description,
+        scam_type=scan_data.scam_type,
+        tags=list(scan_data.extracted_tags),
+        scam_score=scam_score,
+        is_verified_scam=scan_data.is_scam and scan_data.confidence_score >= 70,
+        phash=image_scan.phash,
+        campaign_id=campaign_id
+    )
+    db.add(post)
+    await db.flush()
+
+    scan_result = ScanResult(
+        post_id=post.id,
+        is_scam=scan_data.is_scam,
+        confidence_score=scan_data.confidence_score,
+        scam_type=scan_data.scam_type,
+        risk_level=scan_data.risk_level,
+        extracted_tags=list(scan_data.extracted_tags),
+        analysis=scan_data.analysis,
+        is_fallback=scan_data.is_fallback,
+        image_hash=image_scan.image_hash,
+        phash=image_scan.phash
+    )
+    db.add(scan_result)
+
+    # Reward points (once per day)
+    rewarded, points = await reward_for_report(db, user_id)
+
+    return post, rewarded, points
+
+
+async def publish_post(
+    db: AsyncSession,
+    user_id,
+    image: StagedImage,
+    description: Optional[str],
+    image_scan: ImageScan
+) -> tuple[Post, bool, int]:
+    """
+    Publish a staged image to storage, then create and commit its post
+    (create_post_with_scan) and call post_committed. Storage can't take part
+    in the transaction, so if the post is not committed the published files
+    are deleted again instead of being left behind as orphans.
+    """
+    image_url = await publish_image(image)
+    try:
+        post, rewarded, points = await create_post_with_scan(
+            db, user_id, image_url, description, image_scan, image.variant_urls
+        )
+        await db.commit()
+    except BaseException:
+        await unpublish_image(image)
+        raise
+
+    post_committed(post)
+    return post, rewarded, points
+
+
+def post_committed(post: Post):
+    """
+    Publish a committed post to the in-process feed cache, stats and
+    near-duplicate index. Call only after commit, so a rolled-back post
+    never shows up in them.
+    """
+    feed_cache.post_created(post.scam_type)
+    scam_stats.record_post(post.scam_type, post.created_at)
+    if post.phash:
+        near_duplicate_index.add(post.phash, post.id)
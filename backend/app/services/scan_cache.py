@@ -0,0 +1,170 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.database import dialect_insert
+from app.models.scan_result import ScanResult, ScanResultCache
+from app.services.gemini_service import ScanResultData, get_scan_analyzer
+from app.services.image_hash import compute_dhash, near_duplicate_index
+from app.services.image_ingest import StagedImage, read_staged, prepare_renditions
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ScanCache:
+    """
+    Two-tier cache of analysis results keyed by image hash
+    In-process LRU with TTL in front of the scan_result_cache table.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self._memory = TTLCache(max_entries, ttl_seconds)
+        self.db_hits = 0
+        self.misses = 0
+
+    async def get(self, db: AsyncSession, image_hash: str) -> Optional[ScanResultData]:
+        cached = self._memory.get(image_hash)
+        if cached is not None:
+            return cached
+
+        row = await db.get(ScanResultCache, image_hash)
+        max_age = timedelta(days=settings.SCAN_CACHE_PERSIST_DAYS)
+        if row is None or row.created_at < datetime.utcnow() - max_age:
+            self.misses += 1
+            return None
+
+        data = ScanResultData(
+            is_scam=row.is_scam,
+            confidence_score=row.confidence_score,
+            scam_type=row.scam_type,
+            risk_level=row.risk_level,
+            extracted_tags=list(row.extracted_tags or []),
+            analysis=row.analysis or ""
+        )
+        self._memory.set(image_hash, data)
+        self.db_hits += 1
+        return data
+
+    async def put(self, db: AsyncSession, image_hash: str, data: ScanResultData):
+        """Store a result in both tiers. Fallback results are never cached."""
+        if data.is_fallback:
+            return
+
+        self._memory.set(image_hash, data)
+
+        values = {
+            "image_hash": image_hash,
+            "is_scam": data.is_scam,
+            "confidence_score": data.confidence_score,
+            "scam_type": data.scam_type,
+            "risk_level": data.risk_level,
+            "extracted_tags": list(data.extracted_tags),
+            "analysis": data.analysis,
+            "created_at": datetime.utcnow(),
+        }
+        # One upsert statement: no read-then-write, so concurrent puts of the same
+        # hash neither raise nor deadlock, and the caller's transaction stays usable
+        insert = dialect_insert(ScanResultCache).values(**values)
+        await db.execute(
+            insert.on_conflict_do_update(
+                index_elements=["image_hash"],
+                set_={name: insert.excluded[name] for name in values if name != "image_hash"}
+            )
+        )
+
+    async def invalidate(self, db: AsyncSession, image_hash: str) -> bool:
+        in_memory = self._memory.invalidate(image_hash)
+        result = await db.execute(
+            delete(ScanResultCache).where(ScanResultCache.image_hash == image_hash)
+        )
+        return in_memory or result.rowcount > 0
+
+    def stats(self) -> dict:
+        memory = self._memory.stats()
+        return {
+            "memory_entries": memory["entries"],
+            "memory_hits": memory["hits"],
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+        }
+
+
+scan_cache = ScanCache(settings.SCAN_CACHE_MAX_ENTRIES, settings.SCAN_CACHE_TTL_SECONDS)
+
+
+class ImageScan(BaseModel):
+    image_hash: str
+    phash: Optional[str] = None
+    duplicate_of: Optional[str] = None  # post id of the closest near-duplicate
+    scan_data: Optional[ScanResultData] = None  # None until analyzed
+
+
+async def lookup_scan(db: AsyncSession, image: StagedImage) -> ImageScan:
+    """
+    Find an existing analysis for this image: exact SHA-256 match first, then
+    the closest perceptual near-duplicate. scan_data stays None on a miss.
+    """
+    image_hash = image.sha256
+    phash = await asyncio.to_thread(compute_dhash, image.path)
+    image_scan = ImageScan(image_hash=image_hash, phash=phash)
+
+    if phash:
+        matches = await near_duplicate_index.find(db, phash, settings.PHASH_MAX_DISTANCE)
+        if matches:
+            image_scan.duplicate_of = matches[0][1]
+
+    image_scan.scan_data = await scan_cache.get(db, image_hash)
+    if image_scan.scan_data is not None:
+        logger.debug("Scan cache hit for %s", image_hash[:12])
+        return image_scan
+
+    if image_scan.duplicate_of:
+        result = await db.execute(
+            select(ScanResult).where(
+                ScanResult.post_id == image_scan.duplicate_of,
+                ScanResult.is_fallback.is_(False)
+            )
+        )
+        row = result.scalar_one_or_none()
+        if row is not None:
+            logger.info("Reusing the scan of near-duplicate post %s", image_scan.duplicate_of)
+            image_scan.scan_data = ScanResultData(
+                is_scam=row.is_scam,
+                confidence_score=row.confidence_score,
+                scam_type=row.scam_type,
+                risk_level=row.risk_level,
+                extracted_tags=row.extracted_tags_list,
+                analysis=row.analysis or ""
+            )
+            await scan_cache.put(db, image_hash, image_scan.scan_data)
+
+    return image_scan
+
+
+async def analyze_image_cached(
+    db: AsyncSession,
+    image: StagedImage,
+    analyzer=None
+) -> ImageScan:
+    """
+    Analyze a staged image, reusing any result we already have for the same or a near-identical image
+    analyzer defaults to the configured SCAN_ANALYZER. Commits the caller's session before calling the model.
+    """
+    image_scan = await lookup_scan(db, image)
+    if image_scan.scan_data is not None:
+        return image_scan
+
+    # End the lookup transaction so no pooled connection (or SQLite lock) is held
+    # for the length of the model call; the session starts a new one afterwards
+    await db.commit()
+
+    analyzer = analyzer or get_scan_analyzer()[0]
+    await prepare_renditions(image, analysis=True)
+    image_scan.scan_data = await analyzer(*await read_staged(image))
+    await scan_cache.put(db, image_scan.image_hash, image_scan.scan_data)
+    return image_scan
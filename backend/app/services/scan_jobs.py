@@ -0,0 +1,352 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy import delete, update
+from app.database import AsyncSessionLocal
+from app.models.scan_job import ScanJob
+from app.services.gemini_service import (
+    ScanResultData, calculate_scam_score, get_scan_analyzer, GeminiBusyError
+)
+from app.services.post_service import publish_post
+from app.services.image_ingest import (
+    StagedImage, read_staged, prepare_renditions, discard_staged
+)
+from app.services.scan_cache import scan_cache, lookup_scan
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+AUTO_POST_MIN_SCORE = 40
+BUSY_RETRY_SECONDS = 1.0
+BUSY_ERROR = "AI analysis is busy, try again later"
+LOST_ERROR = "Analysis was interrupted by a server restart, please resubmit"
+
+
+class ScanJobQueueFull(Exception):
+    """Raised when the pending job limit is reached"""
+
+
+class ScanJobData(BaseModel):
+    id: str
+    user_id: str
+    status: str = "queued"  # queued, running, done, failed
+    scan_result: Optional[ScanResultData] = None
+    scam_score: Optional[int] = None
+    post_id: Optional[str] = None
+    rewarded: bool = False
+    points_earned: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    @classmethod
+    def from_row(cls, row: ScanJob) -> "ScanJobData":
+        return cls(
+            id=row.id,
+            user_id=row.user_id,
+            status=row.status,
+            scan_result=ScanResultData(**row.scan_result) if row.scan_result else None,
+            scam_score=row.scam_score,
+            post_id=row.post_id,
+            rewarded=row.rewarded,
+            points_earned=row.points_earned,
+            error=row.error,
+            created_at=row.created_at,
+            finished_at=row.finished_at
+        )
+
+
+class _ScanTask:
+    """Job payload kept out of the public ScanJob model"""
+
+    def __init__(
+        self,
+        job: ScanJobData,
+        image: StagedImage,
+        description: Optional[str],
+        always_post: bool
+    ):
+        self.job = job
+        self.image = image
+        self.description = description
+        self.always_post = always_post
+        self.done = asyncio.Event()
+
+
+class ScanJobQueue:
+    """
+    Bounded pool of background workers running image analysis
+    Submitting returns immediately; Post/ScanResult rows are written when the job finishes.
+    Job state is kept in the scan_jobs table, so a status poll can be answered
+    by any worker process, not only the one running the job. The queue itself
+    is in memory: jobs unfinished at shutdown are failed, and unfinished rows
+    older than SCAN_JOB_STALE_SECONDS (their worker died) are failed at startup
+    and whenever they are read.
+    """
+
+    def __init__(self, analyzer=None, describer=None):
+        self._analyzer = analyzer
+        self._describer = describer
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: dict[str, _ScanTask] = {}
+        self._workers: list[asyncio.Task] = []
+        self._last_prune = 0.0
+
+    async def start(self, num_workers: int = None, max_pending: int = None):
+        if self._workers:
+            return
+        try:
+            await self._fail_stale()
+        except Exception as e:
+            logger.warning("Failing stale scan jobs failed: %s: %s", type(e).__name__, e)
+
+        num_workers = num_workers or settings.SCAN_JOB_WORKERS
+        max_pending = max_pending or settings.SCAN_JOB_MAX_PENDING
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(num_workers)
+        ]
+        logger.info("Started %d scan job workers (max pending: %d)", num_workers, max_pending)
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+        # Queued and cancelled jobs die with this process: fail them instead of leaving them queued
+        for task in self._tasks.values():
+            if task.job.is_finished:
+                continue
+            task.job.status = "failed"
+            task.job.error = LOST_ERROR
+            task.job.finished_at = datetime.utcnow()
+            try:
+                await self._save(task.job)
+            except Exception as e:
+                logger.warning("Saving scan job %s failed: %s: %s", task.job.id, type(e).__name__, e)
+            task.done.set()
+            discard_staged(task.image)
+        self._tasks = {}
+
+    async def submit(
+        self,
+        user_id,
+        image: StagedImage,
+        description: Optional[str] = None,
+        always_post: bool = False
+    ) -> ScanJobData:
+        """
+        Enqueue an analysis, raises ScanJobQueueFull if the queue is saturated
+        The job owns the staged image from here on and removes it when finished.
+        """
+        if self._queue is None:
+            raise RuntimeError("Scan job queue is not running")
+        if self._queue.full():
+            raise ScanJobQueueFull()
+
+        await self._prune()
+        job = ScanJobData(id=str(uuid.uuid4()), user_id=str(user_id), created_at=datetime.utcnow())
+        task = _ScanTask(job, image, description, always_post)
+
+        # Stored before it is queued, so the worker's status updates always find the row
+        async with AsyncSessionLocal() as db:
+            db.add(ScanJob(id=job.id, user_id=job.user_id, status=job.status, created_at=job.created_at))
+            await db.commit()
+
+        try:
+            self._queue.put_nowait(task)
+        except asyncio.QueueFull:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(ScanJob).where(ScanJob.id == job.id))
+                await db.commit()
+            raise ScanJobQueueFull()
+
+        self._tasks[job.id] = task
+        return job
+
+    async def get(self, job_id: str) -> Optional[ScanJobData]:
+        task = self._tasks.get(job_id)
+        if task is not None:
+            return task.job
+
+        async with AsyncSessionLocal() as db:
+            row = await db.get(ScanJob, job_id)
+            if row is None:
+                return None
+            job = ScanJobData.from_row(row)
+
+        if not job.is_finished and job.created_at < self._stale_cutoff():
+            await self._fail_stale()
+            return await self.get(job_id)
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[ScanJobData]:
+        """
+        Long-poll: wait up to timeout seconds for the job to finish
+        Jobs running in this process are awaited directly; jobs of other
+        workers are re-read every SCAN_JOB_POLL_INTERVAL_SECONDS.
+        """
+        task = self._tasks.get(job_id)
+        if task is not None:
+            if timeout > 0 and not task.job.is_finished:
+                try:
+                    await asyncio.wait_for(task.done.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            return task.job
+
+        deadline = time.monotonic() + timeout
+        job = await self.get(job_id)
+        while job is not None and not job.is_finished and time.monotonic() < deadline:
+            await asyncio.sleep(min(settings.SCAN_JOB_POLL_INTERVAL_SECONDS, deadline - time.monotonic()))
+            job = await self.get(job_id)
+        return job
+
+    def _stale_cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=settings.SCAN_JOB_STALE_SECONDS)
+
+    async def _fail_stale(self):
+        """Fail unfinished jobs older than SCAN_JOB_STALE_SECONDS: no worker is running them anymore"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(ScanJob)
+                .where(
+                    ScanJob.status.in_(("queued", "running")),
+                    ScanJob.created_at < self._stale_cutoff(),
+                    ScanJob.id.not_in(list(self._tasks))
+                )
+                .values(status="failed", error=LOST_ERROR, finished_at=datetime.utcnow())
+            )
+            await db.commit()
+        if result.rowcount:
+            logger.warning("Failed %d scan jobs lost by a stopped worker", result.rowcount)
+
+    async def _prune(self):
+        """Drop jobs created more than SCAN_JOB_RESULT_TTL_SECONDS ago (at most once a minute)"""
+        now = time.time()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+
+        cutoff = now - settings.SCAN_JOB_RESULT_TTL_SECONDS
+        expired = [
+            job_id for job_id, task in self._tasks.items()
+            if task.job.finished_at and task.job.finished_at.timestamp() < cutoff
+        ]
+        for job_id in expired:
+            del self._tasks[job_id]
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(ScanJob).where(ScanJob.created_at < datetime.utcfromtimestamp(cutoff))
+            )
+            await db.commit()
+
+    async def _save(self, job: ScanJobData):
+        """Write the job's state to scan_jobs"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(ScanJob)
+                .where(ScanJob.id == job.id)
+                .values(
+                    status=job.status,
+                    scan_result=job.scan_result.model_dump() if job.scan_result else None,
+                    scam_score=job.scam_score,
+                    post_id=job.post_id,
+                    rewarded=job.rewarded,
+                    points_earned=job.points_earned,
+                    error=job.error,
+                    finished_at=job.finished_at
+                )
+            )
+            await db.commit()
+
+    async def _worker(self, index: int):
+        while True:
+            task = await self._queue.get()
+            try:
+                await self._run(task)
+            except GeminiBusyError:
+                logger.warning("Worker %d: scan job %s failed, Gemini stayed busy", index, task.job.id)
+                task.job.status = "failed"
+                task.job.error = BUSY_ERROR
+            except Exception as e:
+                logger.exception("Worker %d: scan job %s failed", index, task.job.id)
+                task.job.status = "failed"
+                task.job.error = f"Analysis failed: {str(e)}"
+            finally:
+                task.job.finished_at = datetime.utcnow()
+                try:
+                    await self._save(task.job)
+                except Exception as e:
+                    logger.warning("Saving scan job %s failed: %s: %s", task.job.id, type(e).__name__, e)
+                task.done.set()
+                discard_staged(task.image)
+                self._queue.task_done()
+
+    async def _run(self, task: _ScanTask):
+        job = task.job
+        job.status = "running"
+        await self._save(job)
+
+        default_analyzer, default_describer = get_scan_analyzer()
+        analyzer = self._analyzer or default_analyzer
+        describer = self._describer or default_describer
+
+        # Short sessions only: no DB connection is held during the model call
+        async with AsyncSessionLocal() as db:
+            image_scan = await lookup_scan(db, task.image)
+            await db.commit()
+
+        if image_scan.scan_data is None:
+            # Workers are already off the request path, so wait for a Gemini slot
+            # instead of failing the job when HTTP callers hold them all (up to a point)
+            await prepare_renditions(task.image, analysis=True)
+            image_bytes, mime_type = await read_staged(task.image)
+            for retry in range(settings.SCAN_JOB_MAX_BUSY_RETRIES + 1):
+                try:
+                    image_scan.scan_data = await analyzer(image_bytes, mime_type)
+                    break
+                except GeminiBusyError:
+                    if retry == settings.SCAN_JOB_MAX_BUSY_RETRIES:
+                        raise
+                    await asyncio.sleep(BUSY_RETRY_SECONDS)
+            del image_bytes
+
+            async with AsyncSessionLocal() as db:
+                await scan_cache.put(db, image_scan.image_hash, image_scan.scan_data)
+                await db.commit()
+
+        scan_data = image_scan.scan_data
+        scam_score = calculate_scam_score(scan_data.risk_level, scan_data.confidence_score)
+        job.scan_result = scan_data
+        job.scam_score = scam_score
+
+        if task.always_post or scam_score >= AUTO_POST_MIN_SCORE:
+            description = task.description
+            if description is None and not task.always_post:
+                description = await describer(scan_data)
+
+            await prepare_renditions(task.image, analysis=False, renditions=True)
+
+            async with AsyncSessionLocal() as db:
+                post, rewarded, points = await publish_post(db, job.user_id, task.image, description, image_scan)
+
+            job.post_id = str(post.id)
+            job.rewarded = rewarded
+            job.points_earned = points
+
+        job.status = "done"
+
+
+scan_job_queue = ScanJobQueue()
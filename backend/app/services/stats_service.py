@@ -0,0 +1,213 @@
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, delete, func
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models.stats import ScamTypeBucket
+from app.models.post import Post
+from app.models.user import User
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# resolution -> (bucket size, how long buckets are kept)
+RESOLUTIONS = {
+    "minute": (timedelta(minutes=1), timedelta(hours=2)),
+    "hour": (timedelta(hours=1), timedelta(days=8)),
+    "day": (timedelta(days=1), timedelta(days=35)),
+}
+
+# trending window -> (resolution it is read from, window length)
+WINDOWS = {
+    "1h": ("minute", timedelta(hours=1)),
+    "24h": ("hour", timedelta(hours=24)),
+    "7d": ("hour", timedelta(days=7)),
+}
+
+Buckets = dict[str, Counter]  # resolution -> Counter[(bucket_start, scam_type)]
+
+
+def bucket_start(at: datetime, resolution: str) -> datetime:
+    if resolution == "minute":
+        return at.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class ScamStats:
+    """
+    Posts per scam_type in minute/hour/day buckets, plus the user count,
+    served from memory for the /posts/stats endpoints.
+
+    Posts created in this process are recorded immediately. Every
+    STATS_FLUSH_INTERVAL_SECONDS the local increments are added to
+    scam_type_buckets and the merged counts of all workers are read back.
+    """
+
+    def __init__(self):
+        self._persisted: Buckets = defaultdict(Counter)  # all workers, as of the last flush
+        self._pending: Buckets = defaultdict(Counter)  # recorded here since the last flush
+        self._flushing: Buckets = defaultdict(Counter)  # being written by flush()
+        self._user_count = 0
+        self._pending_users = 0
+        self._flushing_users = 0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Load (backfilling from posts on first run), then flush periodically"""
+        try:
+            await self._backfill()
+        except Exception as e:
+            logger.warning("Stats backfill failed: %s: %s", type(e).__name__, e)
+        await self.flush()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def record_post(self, scam_type: Optional[str], created_at: Optional[datetime] = None):
+        created_at = created_at or datetime.utcnow()
+        for resolution in RESOLUTIONS:
+            self._pending[resolution][(bucket_start(created_at, resolution), scam_type or "")] += 1
+
+    def record_user(self):
+        self._pending_users += 1
+
+    def _merged(self, resolution: str) -> Counter:
+        return self._persisted[resolution] + self._flushing[resolution] + self._pending[resolution]
+
+    def trending(self, window: str, limit: int = 5) -> list[dict]:
+        """
+        Top scam types over the window: raw count, and a score where each bucket
+        is weighted by 0.5 ** (age / half-life), half-life a quarter of the window
+        """
+        resolution, length = WINDOWS[window]
+        size = RESOLUTIONS[resolution][0]
+        now = datetime.utcnow()
+        half_life = length.total_seconds() / 4
+
+        counts, scores = Counter(), Counter()
+        for (start, scam_type), n in self._merged(resolution).items():
+            if not scam_type or start <= now - length:
+                continue
+            age = max(0.0, (now - start - size / 2).total_seconds())
+            counts[scam_type] += n
+            scores[scam_type] += n * 0.5 ** (age / half_life)
+
+        top = sorted(scores, key=lambda t: (scores[t], counts[t]), reverse=True)[:limit]
+        return [{"type": t, "count": counts[t], "score": round(scores[t], 2)} for t in top]
+
+    def summary(self) -> dict:
+        today = bucket_start(datetime.utcnow(), "day")
+        today_reports = sum(n for (start, _), n in self._merged("day").items() if start == today)
+        return {
+            "today_reports": today_reports,
+            "active_hunters": self._user_count + self._flushing_users + self._pending_users,
+        }
+
+    async def flush(self):
+        async with self._lock:
+            # Kept visible to readers until the reloaded counts include them
+            self._flushing, self._pending = self._pending, defaultdict(Counter)
+            self._flushing_users, self._pending_users = self._pending_users, 0
+            now = datetime.utcnow()
+
+            rows = [
+                {"resolution": resolution, "bucket_start": start, "scam_type": scam_type, "count": n}
+                for resolution, buckets in self._flushing.items()
+                for (start, scam_type), n in buckets.items()
+            ]
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    if rows:
+                        insert = dialect_insert(ScamTypeBucket)
+                        await db.execute(
+                            insert.on_conflict_do_update(
+                                index_elements=["resolution", "bucket_start", "scam_type"],
+                                set_={"count": ScamTypeBucket.count + insert.excluded.count}
+                            ),
+                            rows
+                        )
+                    for resolution, (_, keep) in RESOLUTIONS.items():
+                        await db.execute(
+                            delete(ScamTypeBucket).where(
+                                ScamTypeBucket.resolution == resolution,
+                                ScamTypeBucket.bucket_start < bucket_start(now - keep, resolution)
+                            )
+                        )
+                    await db.commit()
+            except Exception as e:
+                logger.warning("Stats flush failed, retrying next interval: %s: %s", type(e).__name__, e)
+                for resolution, buckets in self._flushing.items():
+                    self._pending[resolution].update(buckets)
+                self._pending_users += self._flushing_users
+                self._flushing, self._flushing_users = defaultdict(Counter), 0
+                return
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(select(ScamTypeBucket))
+                    persisted: Buckets = defaultdict(Counter)
+                    for bucket in result.scalars():
+                        persisted[bucket.resolution][(bucket.bucket_start, bucket.scam_type)] = bucket.count
+                    self._persisted = persisted
+                    self._user_count = await db.scalar(select(func.count(User.id))) or 0
+            except Exception as e:
+                logger.warning("Stats reload failed: %s: %s", type(e).__name__, e)
+            finally:
+                self._flushing, self._flushing_users = defaultdict(Counter), 0
+
+    async def _backfill(self):
+        """First run against an existing database: bucket the posts still inside retention"""
+        async with AsyncSessionLocal() as db:
+            if await db.scalar(select(ScamTypeBucket.resolution).limit(1)) is not None:
+                return
+
+            since = bucket_start(datetime.utcnow() - RESOLUTIONS["day"][1], "day")
+            result = await db.execute(
+                select(Post.scam_type, Post.created_at).where(Post.created_at >= since)
+            )
+            now = datetime.utcnow()
+            buckets: Counter = Counter()
+            for scam_type, created_at in result:
+                for resolution, (_, keep) in RESOLUTIONS.items():
+                    if created_at >= now - keep:
+                        buckets[(resolution, bucket_start(created_at, resolution), scam_type or "")] += 1
+            if not buckets:
+                return
+
+            # Set, not add: workers starting together may both backfill
+            insert = dialect_insert(ScamTypeBucket)
+            await db.execute(
+                insert.on_conflict_do_update(
+                    index_elements=["resolution", "bucket_start", "scam_type"],
+                    set_={"count": insert.excluded.count}
+                ),
+                [
+                    {"resolution": resolution, "bucket_start": start, "scam_type": scam_type, "count": n}
+                    for (resolution, start, scam_type), n in buckets.items()
+                ]
+            )
+            await db.commit()
+            logger.info("Backfilled %d stats buckets from posts", len(buckets))
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.STATS_FLUSH_INTERVAL_SECONDS)
+            await self.flush()
+
+
+scam_stats = ScamStats()
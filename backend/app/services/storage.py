@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import os
+import shutil
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+import aiofiles
+from pydantic import BaseModel
+from app.config import settings
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class StoredObject(BaseModel):
+    key: str
+    size: int
+    modified_at: float  # unix timestamp
+
+
+class StorageBackend(ABC):
+    """Object storage for uploaded images, addressed by key (the upload filename)"""
+
+    @abstractmethod
+    async def put_file(self, key: str, src_path: str, content_type: str):
+        """Store a local file under key. The source file is consumed (moved or deleted)."""
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes, content_type: str):
+        ...
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def stream(self, key: str, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        ...
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        ...
+
+    @abstractmethod
+    def signed_url(self, key: str, expires_in: Optional[int] = None) -> str:
+        """URL a client can fetch the object from (time-limited where the backend supports it)"""
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+
+def public_path(key: str) -> str:
+    return f"/uploads/images/{key}"
+
+
+class LocalStorage(StorageBackend):
+    """
+    Local disk storage sharded by key prefix: root/ab/cd/abcd....jpg
+    so no single directory ends up holding millions of files.
+    Keys written before sharding are still found at root/<key>.
+    Images are served publicly by /uploads, so URLs are not signed.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def shard_path(self, key: str) -> str:
+        digest = hashlib.sha256(key.split("_")[0].split(".")[0].encode()).hexdigest()
+        return os.path.join(self.root, digest[:2], digest[2:4], key)
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Path of an existing object on disk, None if missing"""
+        for path in (self.shard_path(key), os.path.join(self.root, key)):
+            if os.path.isfile(path):
+                return path
+        return None
+
+    async def put_file(self, key: str, src_path: str, content_type: str):
+        dest = self.shard_path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        # Rename when staging shares the filesystem, copy + delete otherwise
+        await asyncio.to_thread(shutil.move, src_path, dest)
+
+    async def put(self, key: str, data: bytes, content_type: str):
+        dest = self.shard_path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        async with aiofiles.open(dest, "wb") as f:
+            await f.write(data)
+
+    async def get(self, key: str) -> bytes:
+        path = self.local_path(key)
+        if path is None:
+            raise FileNotFoundError(key)
+        async with aiofiles.open(path, "rb") as f:
+            return await f.read()
+
+    async def stream(self, key: str, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        path = self.local_path(key)
+        if path is None:
+            raise FileNotFoundError(key)
+        async with aiofiles.open(path, "rb") as f:
+            await f.seek(offset)
+            remaining = length
+            while remaining is None or remaining > 0:
+                size = STREAM_CHUNK_SIZE if remaining is None else min(STREAM_CHUNK_SIZE, remaining)
+                chunk = await f.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        path = self.local_path(key)
+        if path is None:
+            return None
+        stat_result = os.stat(path)
+        return StoredObject(key=key, size=stat_result.st_size, modified_at=stat_result.st_mtime)
+
+    def signed_url(self, key: str, expires_in: Optional[int] = None) -> str:
+        return public_path(key)
+
+    async def delete(self, key: str):
+        path = self.local_path(key)
+        if path is not None:
+            os.remove(path)
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible storage (AWS S3, MinIO, R2, ...) through boto3
+    Calls run in worker threads. Large files go up as concurrent multipart
+    uploads through boto3's transfer manager.
+    """
+
+    def __init__(self):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket = settings.S3_BUCKET
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION or None,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+            multipart_chunksize=settings.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+            max_concurrency=settings.S3_MAX_CONCURRENCY,
+        )
+
+    def _object_key(self, key: str) -> str:
+        return f"{settings.S3_KEY_PREFIX}{key}"
+
+    async def put_file(self, key: str, src_path: str, content_type: str):
+        await asyncio.to_thread(
+            self.client.upload_file,
+            src_path,
+            self.bucket,
+            self._object_key(key),
+            ExtraArgs={
+                "ContentType": content_type,
+                "CacheControl": "public, max-age=31536000, immutable",
+            },
+            Config=self.transfer_config,
+        )
+        os.remove(src_path)
+
+    async def put(self, key: str, data: bytes, content_type: str):
+        await asyncio.to_thread(
+            self.client.put_object,
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Body=data,
+            ContentType=content_type,
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+    async def get(self, key: str) -> bytes:
+        response = await asyncio.to_thread(
+            self.client.get_object, Bucket=self.bucket, Key=self._object_key(key)
+        )
+        return await asyncio.to_thread(response["Body"].read)
+
+    async def stream(self, key: str, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        params = {"Bucket": self.bucket, "Key": self._object_key(key)}
+        if offset or length is not None:
+            end = "" if length is None else str(offset + length - 1)
+            params["Range"] = f"bytes={offset}-{end}"
+        response = await asyncio.to_thread(self.client.get_object, **params)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = await asyncio.to_thread(
+                self.client.head_object, Bucket=self.bucket, Key=self._object_key(key)
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return StoredObject(
+            key=key,
+            size=response["ContentLength"],
+            modified_at=response["LastModified"].timestamp(),
+        )
+
+    def signed_url(self, key: str, expires_in: Optional[int] = None) -> str:
+        if settings.S3_PUBLIC_BASE_URL:
+            return f"{settings.S3_PUBLIC_BASE_URL.rstrip('/')}/{self._object_key(key)}"
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._object_key(key)},
+            ExpiresIn=expires_in or settings.SIGNED_URL_EXPIRE_SECONDS,
+        )
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(
+            self.client.delete_object, Bucket=self.bucket, Key=self._object_key(key)
+        )
+
+
+@lru_cache()
+def get_storage() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage()
+    return LocalStorage(settings.UPLOAD_DIR)
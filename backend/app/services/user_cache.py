@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy import event, select
+from app.core.cache import TTLCache
+from app.database import AsyncSessionLocal
+from app.models.user import User
+from app.config import settings
+
+
+class UserPrincipal(BaseModel):
+    """Slim snapshot of the authenticated user (no password hash, no relationships)"""
+    id: str
+    username: str
+    email: str
+    avatar: str
+    level: int
+    is_verified: bool
+    is_admin: bool
+    token_version: int = 0
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class UserPrincipalCache:
+    """
+    Per-process cache of UserPrincipal snapshots keyed by user id
+    Rows changed through the ORM are invalidated immediately in this process;
+    other workers pick the change up within USER_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        self._memory = TTLCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
+
+    async def get(self, user_id: str) -> Optional[UserPrincipal]:
+        principal = self._memory.get(user_id)
+        if principal is not None:
+            return principal
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(User).where(User.id == user_id))
+            user = result.scalar_one_or_none()
+
+        if user is None:
+            return None
+
+        principal = UserPrincipal.model_validate(user)
+        self._memory.set(user_id, principal)
+        return principal
+
+    def invalidate(self, user_id: str):
+        self._memory.invalidate(user_id)
+
+    def stats(self) -> dict:
+        return self._memory.stats()
+
+
+user_principal_cache = UserPrincipalCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User):
+    user_principal_cache.invalidate(target.id)
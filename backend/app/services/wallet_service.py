@@ -1,49 +1,63 @@
+import uuid
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, String, Text, event, select, update, and_, or_, func, case, literal, exists
 from datetime import date, datetime, timedelta
+from app.core.cache import TTLCache
+from app.database import AsyncSessionLocal, dialect_insert
 from app.models.wallet import Wallet, WalletTransaction, DailyActivity
 from app.config import settings
 
+# (user_id, date) -> get_wallet_dashboard() result. Dropped when a transaction that
+# wrote the user's ledger or daily activity commits in this process; writes made
+# by other workers show up within WALLET_CACHE_TTL_SECONDS.
+wallet_dashboard_cache = TTLCache(settings.WALLET_CACHE_MAX_ENTRIES, settings.WALLET_CACHE_TTL_SECONDS)
 
-async def get_or_create_wallet(db: AsyncSession, user_id) -> Wallet:
-    """Get existing wallet or create new one for user"""
-    result = await db.execute(select(Wallet).where(Wallet.user_id == user_id))
-    wallet = result.scalar_one_or_none()
 
-    if not wallet:
-        wallet = Wallet(user_id=user_id)
-        db.add(wallet)
-        await db.flush()
+def _wallet_changed(db: AsyncSession, user_id):
+    db.info.setdefault("wallet_changed", set()).add(user_id)
 
-    return wallet
 
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_wallets(session: Session):
+    for user_id in session.info.pop("wallet_changed", ()):
+        wallet_dashboard_cache.invalidate((user_id, date.today()))
 
-async def check_daily_activity(db: AsyncSession, user_id, activity_type: str) -> bool:
-    """Check if user has already done activity today"""
-    today = date.today()
-    result = await db.execute(
-        select(DailyActivity).where(
-            and_(
-                DailyActivity.user_id == user_id,
-                DailyActivity.activity_type == activity_type,
-                DailyActivity.activity_date == today
-            )
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_wallets(session: Session):
+    session.info.pop("wallet_changed", None)
+
+
+async def ensure_wallet(db: AsyncSession, user_id) -> str:
+    """Wallet id for the user, creating the wallet if needed (INSERT ... ON CONFLICT DO NOTHING, no race)"""
+    wallet_id = await db.scalar(select(Wallet.id).where(Wallet.user_id == user_id))
+    if wallet_id is None:
+        await db.execute(
+            dialect_insert(Wallet)
+            .values(user_id=user_id)
+            .on_conflict_do_nothing(index_elements=["user_id"])
         )
-    )
-    return result.scalar_one_or_none() is not None
+        wallet_id = await db.scalar(select(Wallet.id).where(Wallet.user_id == user_id))
+    return wallet_id
 
 
 async def record_daily_activity(db: AsyncSession, user_id, activity_type: str) -> bool:
-    """Record daily activity, returns False if already done today"""
-    if await check_daily_activity(db, user_id, activity_type):
-        return False
-
-    activity = DailyActivity(
-        user_id=user_id,
-        activity_type=activity_type,
-        activity_date=date.today()
+    """
+    Claim today's activity in one INSERT ... ON CONFLICT DO NOTHING RETURNING
+    on unique_daily_activity; returns False if already done today. Of two
+    concurrent claims one gets the row and the other False (no IntegrityError).
+    """
+    claimed = await db.scalar(
+        dialect_insert(DailyActivity)
+        .values(user_id=user_id, activity_type=activity_type, activity_date=date.today())
+        .on_conflict_do_nothing(index_elements=["user_id", "activity_type", "activity_date"])
+        .returning(DailyActivity.id)
     )
-    db.add(activity)
+    if claimed is None:
+        return False
+    _wallet_changed(db, user_id)
     return True
 
 
@@ -52,85 +66,225 @@ async def add_points(
     user_id,
     amount: int,
     transaction_type: str,
-    description: str = None
-) -> Wallet:
-    """Add points to user's wallet and record transaction"""
-    wallet = await get_or_create_wallet(db, user_id)
-    wallet.balance += amount
+    description: str = None,
+    idempotency_key: Optional[str] = None
+) -> Optional[int]:
+    """
+    Append a ledger entry and apply it to the balance with a relative UPDATE
+    (two statements when the wallet exists). Returns the new balance, or None
+    if a transaction with the same idempotency_key was already recorded for
+    this wallet (nothing is paid). The caller commits.
+    """
+    # INSERT ... SELECT from wallets, so the wallet id needs no lookup of its own
+    record = (
+        dialect_insert(WalletTransaction)
+        .from_select(
+            ["id", "wallet_id", "amount", "type", "description", "idempotency_key", "created_at"],
+            select(
+                literal(str(uuid.uuid4())),
+                Wallet.id,
+                literal(amount),
+                literal(transaction_type),
+                literal(description, Text),
+                literal(idempotency_key, String),
+                literal(datetime.utcnow())
+            ).where(Wallet.user_id == user_id)
+        )
+        .on_conflict_do_nothing(index_elements=["wallet_id", "idempotency_key"])
+        .returning(WalletTransaction.id)
+    )
+    recorded = await db.scalar(record)
+    if recorded is None:
+        if await db.scalar(select(Wallet.id).where(Wallet.user_id == user_id)) is not None:
+            return None  # idempotency_key already used
+        await ensure_wallet(db, user_id)
+        recorded = await db.scalar(record)
+        if recorded is None:
+            return None
 
+    _wallet_changed(db, user_id)
+    values = {"balance": Wallet.balance + amount}
     if transaction_type == "report":
-        wallet.total_reports += 1
+        values["total_reports"] = Wallet.total_reports + 1
     elif transaction_type == "quiz":
-        wallet.total_quizzes += 1
+        values["total_quizzes"] = Wallet.total_quizzes + 1
 
-    transaction = WalletTransaction(
-        wallet_id=wallet.id,
-        amount=amount,
-        type=transaction_type,
-        description=description
+    return await db.scalar(
+        update(Wallet)
+        .where(Wallet.user_id == user_id)
+        .values(**values)
+        .returning(Wallet.balance)
+        .execution_options(synchronize_session=False)
     )
-    db.add(transaction)
-
-    return wallet
 
 
 async def reward_for_report(db: AsyncSession, user_id) -> tuple[bool, int]:
     """
     Give reward for scam report (once per day)
+    Claim, ledger entry and balance update: three statements in the caller's transaction.
     Returns (success, points_earned)
     """
     if not await record_daily_activity(db, user_id, "report"):
         return False, 0
 
     points = settings.REWARD_REPORT
-    await add_points(db, user_id, points, "report", "Daily scam report reward")
+    await add_points(
+        db, user_id, points, "report", "Daily scam report reward",
+        idempotency_key=f"report:{date.today().isoformat()}"
+    )
     return True, points
 
 
 async def reward_for_quiz(db: AsyncSession, user_id) -> tuple[bool, int]:
     """
-    Give reward for completing quiz (once per day)
+    Give reward for completing quiz (once per day), like reward_for_report
     Returns (success, points_earned)
     """
     if not await record_daily_activity(db, user_id, "quiz"):
         return False, 0
 
     points = 50  # 퀴즈 완료 시 50포인트
-    await add_points(db, user_id, points, "quiz", "Daily quiz completion reward")
+    await add_points(
+        db, user_id, points, "quiz", "Daily quiz completion reward",
+        idempotency_key=f"quiz:{date.today().isoformat()}"
+    )
     return True, points
 
 
-async def get_weekly_history(db: AsyncSession, user_id) -> list[dict]:
-    """Get weekly point history for chart"""
-    wallet = await get_or_create_wallet(db, user_id)
+def _did_today(activity_type: str, today: date):
+    return exists().where(
+        DailyActivity.user_id == Wallet.user_id,
+        DailyActivity.activity_type == activity_type,
+        DailyActivity.activity_date == today
+    )
 
-    # Get transactions from last 7 days
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    result = await db.execute(
-        select(WalletTransaction)
-        .where(
-            and_(
-                WalletTransaction.wallet_id == wallet.id,
-                WalletTransaction.created_at >= week_ago
-            )
+
+def wallet_dashboard_query(user_id, today: date):
+    """
+    Wallet row, today's report/quiz flags and the last 7 days of the ledger
+    summed per (date, type), as one statement: one result row per (date, type),
+    or a single row with day NULL when there were no transactions
+    """
+    day = func.date(WalletTransaction.created_at, type_=Date)
+    weekly = (
+        select(
+            WalletTransaction.wallet_id,
+            day.label("day"),
+            WalletTransaction.type,
+            func.sum(WalletTransaction.amount).label("amount"),
+            func.max(WalletTransaction.created_at).label("last_at")
+        )
+        .join(Wallet, Wallet.id == WalletTransaction.wallet_id)
+        .where(Wallet.user_id == user_id, WalletTransaction.created_at >= datetime.utcnow() - timedelta(days=7))
+        .group_by(WalletTransaction.wallet_id, day, WalletTransaction.type)
+        .subquery()
+    )
+    return (
+        select(
+            Wallet.balance,
+            Wallet.total_reports,
+            Wallet.total_quizzes,
+            _did_today("report", today).label("today_reported"),
+            _did_today("quiz", today).label("today_quiz_completed"),
+            weekly.c.day,
+            weekly.c.type,
+            weekly.c.amount,
+            weekly.c.last_at
         )
-        .order_by(WalletTransaction.created_at)
+        .outerjoin(weekly, weekly.c.wallet_id == Wallet.id)
+        .where(Wallet.user_id == user_id)
     )
-    transactions = result.scalars().all()
 
-    # Group by day
-    days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-    day_names_kr = ["월", "화", "수", "목", "금", "토", "일"]
 
+async def get_wallet_dashboard(db: AsyncSession, user_id) -> dict:
+    """Balance, totals, today's flags and weekly point history (WalletDetailResponse shape), cached per user"""
+    today = date.today()
+    key = (user_id, today)
+    dashboard = wallet_dashboard_cache.get(key)
+    if dashboard is not None:
+        return dashboard
+
+    rows = (await db.execute(wallet_dashboard_query(user_id, today))).all()
+    if not rows:
+        await ensure_wallet(db, user_id)
+        rows = (await db.execute(wallet_dashboard_query(user_id, today))).all()
+
+    # Chart buckets by weekday; a day's type is that of its latest transaction
+    day_names_kr = ["월", "화", "수", "목", "금", "토", "일"]
     daily_totals = {i: 0 for i in range(7)}
     daily_types = {i: "report" for i in range(7)}
+    latest = {}
+    for row in rows:
+        if row.day is None:
+            continue
+        weekday = row.day.weekday()
+        daily_totals[weekday] += row.amount
+        if weekday not in latest or row.last_at > latest[weekday]:
+            latest[weekday] = row.last_at
+            daily_types[weekday] = row.type
 
-    for tx in transactions:
-        weekday = tx.created_at.weekday()
-        daily_totals[weekday] += tx.amount
-        daily_types[weekday] = tx.type
+    first = rows[0]
+    dashboard = {
+        "balance": first.balance,
+        "total_reports": first.total_reports,
+        "total_quizzes": first.total_quizzes,
+        "today_reported": bool(first.today_reported),
+        "today_quiz_completed": bool(first.today_quiz_completed),
+        "history": [
+            {"day": day_names_kr[i], "amount": daily_totals[i], "type": daily_types[i]}
+            for i in range(7)
+        ],
+    }
+    wallet_dashboard_cache.set(key, dashboard)
+    return dashboard
+
+
+def _ledger_total(value):
+    return (
+        select(func.coalesce(func.sum(value), 0))
+        .where(WalletTransaction.wallet_id == Wallet.id)
+        .scalar_subquery()
+    )
+
+
+async def reconcile_wallets(batch_size: int = 500, fix: bool = True) -> list[dict]:
+    """
+    Recompute balance/total_reports/total_quizzes from wallet_transactions,
+    walking wallets in id order, one short transaction per batch.
+    Returns the wallets that had drifted (corrected unless fix=False).
+    """
+    ledger = {
+        "balance": _ledger_total(WalletTransaction.amount),
+        "total_reports": _ledger_total(case((WalletTransaction.type == "report", 1), else_=0)),
+        "total_quizzes": _ledger_total(case((WalletTransaction.type == "quiz", 1), else_=0)),
+    }
+    drifted_where = or_(*(getattr(Wallet, name) != total for name, total in ledger.items()))
+
+    drifted = []
+    last_id = ""
+    while True:
+        async with AsyncSessionLocal() as db:
+            ids = (await db.execute(
+                select(Wallet.id).where(Wallet.id > last_id).order_by(Wallet.id).limit(batch_size)
+            )).scalars().all()
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            result = await db.execute(
+                select(Wallet.id, Wallet.user_id, Wallet.balance, ledger["balance"].label("ledger_balance"))
+                .where(Wallet.id.in_(ids), drifted_where)
+            )
+            batch = [row._asdict() for row in result]
+            if batch and fix:
+                # Recomputed by the UPDATE itself, so entries added since the SELECT are counted too
+                await db.execute(
+                    update(Wallet)
+                    .where(Wallet.id.in_([row["id"] for row in batch]), drifted_where)
+                    .values(**ledger)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            drifted.extend(batch)
 
-    return [
-        {"day": day_names_kr[i], "amount": daily_totals[i], "type": daily_types[i]}
-        for i in range(7)
-    ]
+    return drifted
@@ -0,0 +1,152 @@
+"""
+Micro-benchmark for feed page serialization (50 posts)
+
+  response_model   the original get_posts path: post_to_response per row (json.loads of
+                   the JSON text tag columns, nested UserPublic/ScanResultResponse/PostResponse
+                   models), then FastAPI's response_model serialization into a JSONResponse
+  dict + orjson    post_to_dict over JSON document columns and orjson.dumps, the path the feed now uses
+
+    python bench_serialization.py [iterations]
+
+No database is touched: app.database only builds an engine on import, so an
+in-memory SQLite URL is used unless DATABASE_URL is set.
+"""
+import asyncio
+import json
+import os
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.v1.posts import post_to_dict, format_timestamp
+from app.models.post import Post
+from app.models.scan_result import ScanResult
+from app.models.user import User
+from app.schemas.post import PostListResponse, PostResponse, ScanResultResponse
+from app.schemas.user import UserPublic
+
+PAGE_SIZE = 50
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+
+def make_page(text_columns: bool = False) -> list[Post]:
+    """A feed page; text_columns stores tags/variants as JSON text, as the original schema did"""
+    encode = (lambda value: json.dumps(value, ensure_ascii=False)) if text_columns else (lambda value: value)
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    user = User(
+        id=str(uuid.UUID(int=0)), username="hunter", email="hunter@example.com", hashed_password="x",
+        avatar="https://picsum.photos/seed/hunter/200/200", level=3, is_verified=True, is_admin=False
+    )
+    posts = []
+    for i in range(PAGE_SIZE):
+        post = Post(
+            id=str(uuid.UUID(int=i + 1)), user_id=user.id, image_url=f"/uploads/images/{uuid.UUID(int=i + 1)}.jpg",
+            image_variants=encode(
+                {f"{fmt}_{w}": f"/uploads/images/x_{w}w.{fmt}" for fmt in ("webp", "jpeg") for w in (320, 640, 1080)}
+            ),
+            description="택배 배송 조회를 사칭한 스미싱 문자입니다. 링크를 누르지 마세요.",
+            scam_type="Smishing", tags=encode(["택배", "스미싱", "링크", "사칭"]),
+            like_count=i * 3, comment_count=i, is_verified_scam=bool(i % 2), scam_score=40 + i % 60,
+            campaign_id=None, created_at=now - timedelta(minutes=i)
+        )
+        post.user = user
+        post.scan_result = ScanResult(
+            id=post.id, post_id=post.id, is_scam=True, confidence_score=87, scam_type="Smishing",
+            risk_level="HIGH", extracted_tags=encode(["택배", "URL", "긴급"]),
+            analysis="발신 번호가 국제 번호이고 단축 URL을 포함하고 있어 스미싱일 가능성이 높습니다."
+        )
+        posts.append(post)
+    return posts
+
+
+def parse_json_text(value, default):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return default
+    return value or default
+
+
+def post_to_response(post: Post) -> PostResponse:
+    """The original per-row conversion, with the fields added since filled the same way"""
+    user_public = UserPublic(
+        id=post.user.id,
+        username=post.user.username,
+        avatar=post.user.avatar,
+        level=post.user.level,
+        is_verified=post.user.is_verified
+    )
+
+    scan_result = None
+    if post.scan_result:
+        scan_result = ScanResultResponse(
+            is_scam=post.scan_result.is_scam,
+            confidence_score=post.scan_result.confidence_score,
+            scam_type=post.scan_result.scam_type,
+            risk_level=post.scan_result.risk_level,
+            extracted_tags=parse_json_text(post.scan_result.extracted_tags, []),
+            analysis=post.scan_result.analysis or ""
+        )
+
+    return PostResponse(
+        id=post.id,
+        user=user_public,
+        imageUrl=post.image_url,
+        imageVariants=parse_json_text(post.image_variants, {}),
+        description=post.description,
+        scamType=post.scam_type,
+        tags=parse_json_text(post.tags, []),
+        timestamp=format_timestamp(post.created_at),
+        likeCount=post.like_count,
+        commentCount=post.comment_count,
+        isVerifiedScam=post.is_verified_scam,
+        scamScore=post.scam_score,
+        campaignId=post.campaign_id,
+        scanResult=scan_result
+    )
+
+
+# What FastAPI builds for a route declared with response_model=PostListResponse
+RESPONSE_FIELD = create_model_field("Response_get_posts", PostListResponse, mode="serialization")
+event_loop = asyncio.new_event_loop()
+
+
+def response_model_path(posts: list[Post]) -> bytes:
+    page = PostListResponse(posts=[post_to_response(p) for p in posts], total=1000, page=1, size=PAGE_SIZE)
+    content = event_loop.run_until_complete(serialize_response(field=RESPONSE_FIELD, response_content=page))
+    return JSONResponse(content).body
+
+
+def orjson_path(posts: list[Post]) -> bytes:
+    return orjson.dumps({
+        "posts": [post_to_dict(p) for p in posts],
+        "total": 1000,
+        "page": 1,
+        "size": PAGE_SIZE,
+        "next_cursor": None,
+    })
+
+
+def report(name: str, fn, posts):
+    seconds = min(timeit.repeat(lambda: fn(posts), number=ITERATIONS, repeat=3)) / ITERATIONS
+    print(f"{name:<16} {seconds * 1e3:>8.3f} ms/page  {seconds / PAGE_SIZE * 1e6:>8.2f} us/post")
+
+
+def main():
+    original_posts, posts = make_page(text_columns=True), make_page()
+    assert json.loads(response_model_path(original_posts)) == json.loads(orjson_path(posts))
+    report("response_model", response_model_path, original_posts)
+    report("dict + orjson", orjson_path, posts)
+
+
+if __name__ == "__main__":
+    main()
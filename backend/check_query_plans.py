@@ -0,0 +1,161 @@
+"""
+EXPLAIN-based index regression check for the hot query paths (PostgreSQL only)
+
+Seeds a realistic dataset inside a transaction, runs EXPLAIN on the feed
+(page and total count), comment and wallet queries and exits non-zero if any of them falls back to a
+sequential scan. Everything is rolled back afterwards.
+
+    DATABASE_URL=postgresql+asyncpg://... python check_query_plans.py
+
+tests/test_query_plans.py runs the same check under pytest when
+TEST_POSTGRES_URL is set.
+"""
+import asyncio
+import sys
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, desc, func, and_, or_, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.database import run_migrations, json_array_contains
+from app.models import Post, Comment, User
+from app.services.comment_service import COMMENT_COLUMNS, latest_comments_query
+from app.services.wallet_service import wallet_dashboard_query
+
+SEED_USERS = 500
+SEED_POSTS = 50_000
+SEED_COMMENTS = 200_000
+SEED_TRANSACTIONS = 100_000
+SEED_TAGS = 200
+SEED_SCAM_TYPES = 20
+
+SEED_SQL = [
+    f"""
+    INSERT INTO users (id, username, email, hashed_password, avatar, level, is_verified, is_admin, created_at, updated_at)
+    SELECT 'u' || i, 'plan_user_' || i, 'plan_user_' || i || '@example.com', 'x', '', 1, false, false, now(), now()
+    FROM generate_series(1, {SEED_USERS}) AS i
+    """,
+    """
+    INSERT INTO wallets (id, user_id, balance, total_reports, total_quizzes, created_at, updated_at)
+    SELECT 'w' || substr(id, 2), id, 0, 0, 0, now(), now() FROM users WHERE id LIKE 'u%'
+    """,
+    f"""
+    INSERT INTO posts (id, user_id, image_url, image_variants, scam_type, tags, like_count, comment_count,
+                       is_verified_scam, scam_score, created_at, updated_at)
+    SELECT 'p' || i, 'u' || (i % {SEED_USERS} + 1), '/uploads/images/x.jpg', '{{}}'::jsonb,
+           'scam_type_' || (i % {SEED_SCAM_TYPES}),
+           jsonb_build_array('tag' || (i % {SEED_TAGS}), 'common'),
+           0, 0, false, i % 100, now() - (i || ' minutes')::interval, now()
+    FROM generate_series(1, {SEED_POSTS}) AS i
+    """,
+    f"""
+    INSERT INTO comments (id, post_id, user_id, content, created_at)
+    SELECT 'c' || i, 'p' || (i % {SEED_POSTS} + 1), 'u' || (i % {SEED_USERS} + 1), 'comment',
+           now() - (i || ' seconds')::interval
+    FROM generate_series(1, {SEED_COMMENTS}) AS i
+    """,
+    f"""
+    INSERT INTO wallet_transactions (id, wallet_id, amount, type, description, created_at)
+    SELECT 't' || i, 'w' || (i % {SEED_USERS} + 1), 10, 'report', NULL, now() - (i || ' minutes')::interval
+    FROM generate_series(1, {SEED_TRANSACTIONS}) AS i
+    """,
+    f"""
+    INSERT INTO daily_activities (id, user_id, activity_type, activity_date, created_at)
+    SELECT 'd' || i, 'u' || (i % {SEED_USERS} + 1), 'report', current_date - (i / {SEED_USERS}), now()
+    FROM generate_series(1, {SEED_USERS * 60}) AS i
+    """,
+    "ANALYZE users, wallets, posts, comments, wallet_transactions, daily_activities",
+]
+
+# Tables that must be reached through an index
+CHECKED_TABLES = {"posts", "comments", "wallet_transactions", "daily_activities"}
+
+
+def hot_queries() -> dict:
+    """The statements issued by the feed, comment and wallet endpoints"""
+    cursor_created_at = datetime.utcnow() - timedelta(days=10)
+    feed = select(Post).order_by(desc(Post.created_at), desc(Post.id))
+    count = select(func.count(Post.id))
+    by_scam_type = Post.scam_type == "scam_type_7"
+    by_tag = json_array_contains(Post.tags, "tag42")
+
+    return {
+        "feed first page": feed.limit(21),
+        "feed by cursor": feed.where(
+            or_(
+                Post.created_at < cursor_created_at,
+                and_(Post.created_at == cursor_created_at, Post.id < "p5000")
+            )
+        ).limit(21),
+        "feed by scam type": feed.where(by_scam_type).limit(21),
+        "feed by tag": feed.where(by_tag).limit(21),
+        # The unfiltered total counts every row by definition; the filtered ones must not
+        "feed count by scam type": count.where(by_scam_type),
+        "feed count by tag": count.where(by_tag),
+        "comments for post": select(*COMMENT_COLUMNS)
+            .join(User, User.id == Comment.user_id)
+            .where(Comment.post_id == "p42")
+            .order_by(Comment.created_at, Comment.id)
+            .limit(21),
+        "comment previews": latest_comments_query([f"p{i}" for i in range(1, 21)], 3),
+        "wallet dashboard": wallet_dashboard_query("u7", date.today()),
+    }
+
+
+def find_seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in CHECKED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child))
+    return found
+
+
+async def explain_hot_queries(conn) -> dict[str, dict]:
+    """
+    Seed the dataset and return the EXPLAIN plan of each hot query by name
+    Runs inside a transaction on conn that is always rolled back.
+    """
+    plans = {}
+    transaction = await conn.begin()
+    try:
+        for statement in SEED_SQL:
+            await conn.execute(text(statement))
+
+        for name, query in hot_queries().items():
+            sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+            plans[name] = result.scalar()[0]["Plan"]
+    finally:
+        await transaction.rollback()
+    return plans
+
+
+async def main() -> int:
+    if not settings.DATABASE_URL.startswith("postgresql"):
+        print("check_query_plans.py needs a PostgreSQL DATABASE_URL")
+        return 2
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    failures = 0
+
+    async with engine.connect() as conn:
+        await conn.run_sync(run_migrations)
+        await conn.commit()
+        plans = await explain_hot_queries(conn)
+
+    for name, plan in plans.items():
+        seq_scans = find_seq_scans(plan)
+        if seq_scans:
+            failures += 1
+            print(f"FAIL  {name}: sequential scan on {', '.join(seq_scans)}")
+        else:
+            print(f"ok    {name}: {plan['Node Type']} (cost {plan['Total Cost']})")
+
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
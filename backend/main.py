@@ -1,17 +1,34 @@
+import logging
 import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import hmac
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from sqlalchemy import select
 
-from app.database import init_db, AsyncSessionLocal
+from app.database import init_db, AsyncSessionLocal, engine
 from app.api.router import api_router
+from app.api.uploads import router as uploads_router
 from app.models.user import User
-from app.models.wallet import Wallet
 from app.core.security import get_password_hash
+from app.services.scan_jobs import scan_job_queue
+from app.services.wallet_service import add_points
+from app.services.like_service import like_counter_buffer
+from app.services.counter_reconciler import counter_reconciler
+from app.services.stats_service import scam_stats
+from app.services.gemini_service import GeminiBusyError
+from app.services.image_hash import near_duplicate_index
+from app.services.image_ingest import UploadTooLarge, InvalidImageData
+from app.services.image_processing import start_image_pool, shutdown_image_pool
+from app.core.body_limit import BodySizeLimitMiddleware
+from app.core.metrics import metrics
 from app.config import settings
 
+# uvicorn only configures its own loggers: give the app.* loggers a handler and level
+logging.basicConfig(format="%(levelname)s:     %(name)s - %(message)s")
+logging.getLogger("app").setLevel(settings.LOG_LEVEL)
+
 
 async def create_admin_user():
     """Create admin user if not exists"""
@@ -25,7 +42,7 @@ async def create_admin_user():
             admin = User(
                 username=settings.ADMIN_USERNAME,
                 email=settings.ADMIN_EMAIL,
-                hashed_password=get_password_hash(settings.ADMIN_PASSWORD),
+                hashed_password=await get_password_hash(settings.ADMIN_PASSWORD),
                 is_admin=True,
                 is_verified=True,
                 level=10,
@@ -34,9 +51,11 @@ async def create_admin_user():
             db.add(admin)
             await db.flush()
 
-            # Create wallet for admin
-            wallet = Wallet(user_id=admin.id, balance=10000)
-            db.add(wallet)
+            # Create wallet for admin, funded through the ledger
+            await add_points(
+                db, admin.id, 10000, "adjustment", "Initial admin balance",
+                idempotency_key="initial-balance"
+            )
 
             await db.commit()
             print(f"Admin user created: {settings.ADMIN_EMAIL}")
@@ -62,14 +81,34 @@ async def lifespan(app: FastAPI):
         
         # Create admin user
         await create_admin_user()
+
+        # Warm the near-duplicate image index
+        async with AsyncSessionLocal() as db:
+            await near_duplicate_index.load(db)
     except Exception as e:
         print(f"Warning: Database initialization failed: {e}")
         print("App will start but database features may not work")
 
+    # Start image processing pool and background scan workers
+    start_image_pool()
+    await scan_job_queue.start()
+    if settings.LIKE_WRITE_BEHIND:
+        like_counter_buffer.start()
+    counter_reconciler.start()
+    near_duplicate_index.start()
+    await scam_stats.start()
+
     yield
 
     # Shutdown
     print("Shutting down...")
+    await scan_job_queue.stop()
+    await counter_reconciler.stop()
+    await near_duplicate_index.stop()
+    await scam_stats.stop()
+    await like_counter_buffer.stop()
+    shutdown_image_pool()
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -79,6 +118,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Reject oversized bodies before they are parsed or buffered
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=settings.MAX_REQUEST_BYTES)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -94,8 +136,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for uploads
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+@app.exception_handler(GeminiBusyError)
+async def gemini_busy_handler(request: Request, exc: GeminiBusyError):
+    """All Gemini call slots are taken, fail fast instead of queueing"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "AI analysis is busy, try again later"},
+        headers={"Retry-After": "5"},
+    )
+
+@app.exception_handler(UploadTooLarge)
+async def upload_too_large_handler(request: Request, exc: UploadTooLarge):
+    return JSONResponse(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        content={"detail": f"Image exceeds {settings.MAX_UPLOAD_BYTES} bytes"},
+    )
+
+
+@app.exception_handler(InvalidImageData)
+async def invalid_image_data_handler(request: Request, exc: InvalidImageData):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": "Invalid base64 image data"},
+    )
+
+# Uploaded images (immutable caching, ETag, ranges, WebP negotiation)
+app.include_router(uploads_router)
 
 # Include API router
 app.include_router(api_router)
@@ -115,6 +181,17 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    """DB pool and query metrics in the Prometheus text format (disabled until METRICS_TOKEN is set)"""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not hmac.compare_digest(request.headers.get("authorization", ""), expected):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,48 @@
+"""scan result cache
+
+Scan results keyed by image SHA-256. Before Alembic, create_all already made
+the new scan_result_cache table on existing databases (but never added
+columns to existing tables), so existing items are skipped.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 13:11:54
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if 'scan_result_cache' not in inspector.get_table_names():
+        op.create_table('scan_result_cache',
+        sa.Column('image_hash', sa.String(length=64), nullable=False),
+        sa.Column('is_scam', sa.Boolean(), nullable=False),
+        sa.Column('confidence_score', sa.Integer(), nullable=False),
+        sa.Column('scam_type', sa.String(length=100), nullable=False),
+        sa.Column('risk_level', sa.String(length=20), nullable=False),
+        sa.Column('extracted_tags', sa.Text(), nullable=False),
+        sa.Column('analysis', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('image_hash')
+        )
+
+    if 'image_hash' not in {c['name'] for c in inspector.get_columns('scan_results')}:
+        op.add_column('scan_results', sa.Column('image_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_scan_results_image_hash', 'scan_results', ['image_hash'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scan_results_image_hash', table_name='scan_results')
+    with op.batch_alter_table('scan_results') as batch_op:
+        batch_op.drop_column('image_hash')
+    op.drop_table('scan_result_cache')
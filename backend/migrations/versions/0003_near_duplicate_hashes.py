@@ -0,0 +1,47 @@
+"""near duplicate hashes
+
+Perceptual hashes on posts and scan results, the campaign a near-duplicate
+post joins, and the fallback flag that keeps placeholder analyses out of
+reuse. Columns that already exist are skipped.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 13:13:22
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    post_columns = {c['name'] for c in inspector.get_columns('posts')}
+    scan_columns = {c['name'] for c in inspector.get_columns('scan_results')}
+
+    if 'phash' not in post_columns:
+        op.add_column('posts', sa.Column('phash', sa.String(length=16), nullable=True))
+    if 'campaign_id' not in post_columns:
+        op.add_column('posts', sa.Column('campaign_id', sa.String(length=36), nullable=True))
+    op.create_index('ix_posts_campaign_id', 'posts', ['campaign_id'], unique=False, if_not_exists=True)
+
+    if 'phash' not in scan_columns:
+        op.add_column('scan_results', sa.Column('phash', sa.String(length=16), nullable=True))
+    if 'is_fallback' not in scan_columns:
+        op.add_column('scan_results', sa.Column('is_fallback', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('scan_results') as batch_op:
+        batch_op.drop_column('is_fallback')
+        batch_op.drop_column('phash')
+    op.drop_index('ix_posts_campaign_id', table_name='posts')
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('campaign_id')
+        batch_op.drop_column('phash')
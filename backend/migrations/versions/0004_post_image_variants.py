@@ -0,0 +1,29 @@
+"""post image variants
+
+Resized rendition URLs of a post's image, as a JSON object; existing posts
+get an empty one. Skipped if the column already exists.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 13:16:28
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if 'image_variants' not in {c['name'] for c in sa.inspect(op.get_bind()).get_columns('posts')}:
+        op.add_column('posts', sa.Column('image_variants', sa.Text(), server_default='{}', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('image_variants')
@@ -0,0 +1,41 @@
+"""hot path indexes
+
+Composite indexes for the feed (created_at, id keyset order, scam_type filter),
+comment threads and wallet history.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 13:24:07
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_posts_scam_type_created_at_id', 'posts', ['scam_type', 'created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_posts_user_id_created_at', 'posts', ['user_id', 'created_at'], unique=False, if_not_exists=True)
+    op.create_index('ix_comments_post_id_created_at', 'comments', ['post_id', 'created_at'], unique=False, if_not_exists=True)
+    op.create_index(
+        'ix_wallet_transactions_wallet_id_created_at',
+        'wallet_transactions',
+        ['wallet_id', 'created_at'],
+        unique=False,
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_wallet_transactions_wallet_id_created_at', table_name='wallet_transactions')
+    op.drop_index('ix_comments_post_id_created_at', table_name='comments')
+    op.drop_index('ix_posts_user_id_created_at', table_name='posts')
+    op.drop_index('ix_posts_scam_type_created_at_id', table_name='posts')
+    op.drop_index('ix_posts_created_at_id', table_name='posts')
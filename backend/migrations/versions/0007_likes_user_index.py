@@ -0,0 +1,24 @@
+"""likes user index
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 14:40:52
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_likes_user_id_post_id', 'likes', ['user_id', 'post_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_likes_user_id_post_id', table_name='likes')
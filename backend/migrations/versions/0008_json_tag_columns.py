@@ -0,0 +1,56 @@
+"""json tag columns
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 16:05:37
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TAG_COLUMNS = [('posts', 'tags'), ('scan_results', 'extracted_tags')]
+JSON_TYPE = sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql')
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    for table, column in TAG_COLUMNS:
+        # Existing values are json.dumps output; empty strings become []
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.Text(),
+                type_=JSON_TYPE,
+                existing_nullable=False,
+                postgresql_using=f"COALESCE(NULLIF({column}, '')::jsonb, '[]'::jsonb)",
+            )
+        if not is_postgresql:
+            op.execute(f"UPDATE {table} SET {column} = '[]' WHERE {column} = ''")
+
+    if is_postgresql:
+        op.create_index(
+            'ix_posts_tags', 'posts', ['tags'], unique=False,
+            postgresql_using='gin', postgresql_ops={'tags': 'jsonb_path_ops'}
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_posts_tags', table_name='posts', postgresql_using='gin')
+    for table, column in TAG_COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=JSON_TYPE,
+                type_=sa.Text(),
+                existing_nullable=False,
+                postgresql_using=f"{column}::text",
+            )
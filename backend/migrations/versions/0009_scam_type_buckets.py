@@ -0,0 +1,30 @@
+"""scam type buckets
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 17:21:09
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('scam_type_buckets',
+    sa.Column('resolution', sa.String(length=8), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('scam_type', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('resolution', 'bucket_start', 'scam_type')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scam_type_buckets')
@@ -0,0 +1,64 @@
+"""wallet ledger idempotency
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 18:02:44
+"""
+import uuid
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPENING_BALANCE_KEY = 'opening-balance'
+
+
+def upgrade() -> None:
+    op.add_column('wallet_transactions', sa.Column('idempotency_key', sa.String(length=100), nullable=True))
+    op.create_index(
+        'ux_wallet_transactions_wallet_id_idempotency_key', 'wallet_transactions',
+        ['wallet_id', 'idempotency_key'], unique=True
+    )
+
+    # Balances become derivable from the ledger: record whatever the ledger
+    # doesn't explain yet (e.g. the seeded admin balance) as one opening entry
+    bind = op.get_bind()
+    drifted = bind.execute(sa.text(
+        """
+        SELECT w.id, w.balance - COALESCE(SUM(t.amount), 0) AS missing
+        FROM wallets w LEFT JOIN wallet_transactions t ON t.wallet_id = w.id
+        GROUP BY w.id, w.balance
+        HAVING w.balance <> COALESCE(SUM(t.amount), 0)
+        """
+    )).all()
+    if drifted:
+        op.bulk_insert(
+            sa.table(
+                'wallet_transactions',
+                sa.column('id', sa.String), sa.column('wallet_id', sa.String), sa.column('amount', sa.Integer),
+                sa.column('type', sa.String), sa.column('description', sa.Text),
+                sa.column('idempotency_key', sa.String), sa.column('created_at', sa.DateTime),
+            ),
+            [
+                {
+                    'id': str(uuid.uuid4()), 'wallet_id': wallet_id, 'amount': missing, 'type': 'adjustment',
+                    'description': 'Opening balance', 'idempotency_key': OPENING_BALANCE_KEY,
+                    'created_at': datetime.utcnow(),
+                }
+                for wallet_id, missing in drifted
+            ]
+        )
+
+
+def downgrade() -> None:
+    op.execute(f"DELETE FROM wallet_transactions WHERE idempotency_key = '{OPENING_BALANCE_KEY}'")
+    op.drop_index('ux_wallet_transactions_wallet_id_idempotency_key', table_name='wallet_transactions')
+    with op.batch_alter_table('wallet_transactions') as batch_op:
+        batch_op.drop_column('idempotency_key')
@@ -0,0 +1,57 @@
+"""json document columns
+
+posts.image_variants and scan_result_cache.extracted_tags move from JSON
+text to the JSON/JSONB document type, like the tag columns in 0008, so they
+are decoded by the driver instead of per request.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 09:12:30
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, empty document)
+DOCUMENT_COLUMNS = [('posts', 'image_variants', '{}'), ('scan_result_cache', 'extracted_tags', '[]')]
+JSON_TYPE = sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql')
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    for table, column, empty in DOCUMENT_COLUMNS:
+        # The text server default of 0004 can't be cast to jsonb; the model default covers inserts
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, existing_type=sa.Text(), server_default=None, existing_nullable=False)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.Text(),
+                type_=JSON_TYPE,
+                existing_nullable=False,
+                postgresql_using=f"COALESCE(NULLIF({column}, '')::jsonb, '{empty}'::jsonb)",
+            )
+        if not is_postgresql:
+            op.execute(f"UPDATE {table} SET {column} = '{empty}' WHERE {column} = ''")
+
+
+def downgrade() -> None:
+    for table, column, empty in DOCUMENT_COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=JSON_TYPE,
+                type_=sa.Text(),
+                existing_nullable=False,
+                postgresql_using=f"{column}::text",
+            )
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.alter_column('image_variants', existing_type=sa.Text(), server_default='{}', existing_nullable=False)
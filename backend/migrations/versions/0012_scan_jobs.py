@@ -0,0 +1,41 @@
+"""scan jobs
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 10:04:51
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('scan_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('scan_result', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=True),
+    sa.Column('scam_score', sa.Integer(), nullable=True),
+    sa.Column('post_id', sa.String(length=36), nullable=True),
+    sa.Column('rewarded', sa.Boolean(), nullable=False),
+    sa.Column('points_earned', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_scan_jobs_created_at', 'scan_jobs', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scan_jobs_created_at', table_name='scan_jobs')
+    op.drop_table('scan_jobs')
@@ -0,0 +1,36 @@
+"""
+Recompute wallet balances and report/quiz totals from the wallet_transactions ledger
+
+Walks wallets in batches, each batch its own short transaction, and corrects
+every wallet whose stored totals differ from its ledger.
+
+    python reconcile_wallets.py [--dry-run] [--batch-size N]
+"""
+import argparse
+import asyncio
+import sys
+
+from app.database import engine
+from app.services.wallet_service import reconcile_wallets
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="only report drifted wallets")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    try:
+        drifted = await reconcile_wallets(batch_size=args.batch_size, fix=not args.dry_run)
+    finally:
+        await engine.dispose()
+
+    for row in drifted:
+        print(f"{'drift' if args.dry_run else 'fixed'}  wallet {row['id']} (user {row['user_id']}): "
+              f"balance {row['balance']} -> {row['ledger_balance']}")
+    print(f"{len(drifted)} wallet(s) {'drifted' if args.dry_run else 'corrected'}")
+    return 1 if drifted and args.dry_run else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+import httpx
+import pytest
+
+# Settings are read at import time: point the app at a throwaway database and
+# upload directory before anything imports it
+_workdir = tempfile.mkdtemp(prefix="scamstagram-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_workdir}/test.db")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_workdir, "uploads", "images"))
+os.environ.setdefault("UPLOAD_STAGING_DIR", os.path.join(_workdir, "uploads", "staging"))
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("COUNTER_RECONCILE_INTERVAL_SECONDS", "0")
+os.environ.setdefault("LOGIN_MAX_ATTEMPTS_PER_IP", "1000")  # every test logs in from the same address
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    """HTTP client for the app, started and stopped through its lifespan"""
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            yield c
+
+
+@pytest.fixture
+async def auth_headers(client):
+    credentials = {"username": "tester", "email": "tester@example.com", "password": "pw12345"}
+    await client.post("/api/v1/auth/register", json=credentials)
+    response = await client.post(
+        "/api/v1/auth/login", json={"email": credentials["email"], "password": credentials["password"]}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
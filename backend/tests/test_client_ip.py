@@ -0,0 +1,28 @@
+"""client_ip: the IP limiter key must come from the proxy's X-Forwarded-For entry, not the client's"""
+from starlette.requests import Request
+
+from app.api.v1.auth import client_ip
+from app.config import settings
+
+
+def make_request(*forwarded: str) -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded]
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 1234)})
+
+
+def test_direct_connection_ignores_forwarded_header(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 0)
+    assert client_ip(make_request("203.0.113.9")) == "10.0.0.1"
+
+
+def test_one_proxy_uses_the_entry_it_appended(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 1)
+    assert client_ip(make_request("1.2.3.4, 203.0.113.9")) == "203.0.113.9"
+    assert client_ip(make_request("1.2.3.4", "203.0.113.9")) == "203.0.113.9"
+    assert client_ip(make_request()) == "10.0.0.1"
+
+
+def test_two_proxies_skip_the_inner_hop(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 2)
+    assert client_ip(make_request("1.2.3.4, 203.0.113.9, 10.1.1.1")) == "203.0.113.9"
+    assert client_ip(make_request("203.0.113.9")) == "203.0.113.9"
@@ -0,0 +1,18 @@
+"""Feed paging parameters are validated instead of reaching the query"""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("size", [0, -1, 100000])
+async def test_out_of_range_page_size_is_rejected(client, auth_headers, size):
+    response = await client.get("/api/v1/posts/", params={"size": size}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+async def test_feed_page(client, auth_headers):
+    response = await client.get("/api/v1/posts/", params={"size": 1}, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["size"] == 1
+    assert len(body["posts"]) <= 1
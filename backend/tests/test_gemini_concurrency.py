@@ -0,0 +1,114 @@
+"""
+Load test for the Gemini call path: the SDK call blocks, so it must run off
+the event loop. Enough analyses to hold every Gemini slot are kept in flight
+against a stubbed model that blocks like the real one, while the authenticated
+feed is polled and its p99 latency must stay low.
+"""
+import asyncio
+import base64
+import io
+import itertools
+import json
+import os
+import statistics
+import time
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Post
+from app.services import gemini_service
+
+CONCURRENT_SCANS = settings.GEMINI_MAX_CONCURRENCY
+MODEL_LATENCY_SECONDS = 3.0
+FEED_POSTS = 30
+MAX_FEED_P99_SECONDS = 0.25
+
+pytestmark = pytest.mark.anyio
+
+
+class BlockingModel:
+    """Stands in for genai.GenerativeModel; generate_content blocks the calling thread"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, contents):
+        self.calls += 1
+        time.sleep(MODEL_LATENCY_SECONDS)
+        return SimpleNamespace(text=json.dumps({
+            "isScam": False,
+            "confidenceScore": 10,
+            "scamType": "안전",
+            "riskLevel": "LOW",
+            "extractedTags": ["테스트"],
+            "analysis": "stub",
+        }))
+
+
+def noise_png() -> str:
+    """Random-noise image, so neither the SHA-256 nor the perceptual hash matches another"""
+    buffer = io.BytesIO()
+    Image.frombytes("L", (64, 64), os.urandom(64 * 64)).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+@pytest.fixture
+async def feed_posts(client, auth_headers):
+    user_id = (await client.get("/api/v1/auth/me", headers=auth_headers)).json()["id"]
+    async with AsyncSessionLocal() as db:
+        db.add_all(
+            Post(user_id=user_id, image_url="/uploads/images/x.jpg", scam_type="피싱", tags=["load", f"t{i % 3}"])
+            for i in range(FEED_POSTS)
+        )
+        await db.commit()
+
+
+async def test_feed_stays_fast_while_gemini_is_saturated(client, auth_headers, feed_posts, monkeypatch):
+    model = BlockingModel()
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "SCAN_ANALYZER", "gemini")
+    monkeypatch.setattr(gemini_service, "get_gemini_model", lambda: model)
+
+    async def scan():
+        return await client.post(
+            "/api/v1/posts/analyze-json",
+            json={"image_data": noise_png(), "mime_type": "image/png"},
+            headers=auth_headers,
+        )
+
+    # Cached first page, and a tag-filtered page that always queries the database
+    feed_params = itertools.cycle([{"size": 10}, {"size": 10, "tag": "load"}])
+
+    started = time.perf_counter()
+    scans = asyncio.gather(*(scan() for _ in range(CONCURRENT_SCANS)))
+
+    feed_latencies = []
+    while not scans.done():
+        saturated = gemini_service._gemini_semaphore.locked()
+        before = time.perf_counter()
+        response = await client.get(
+            "/api/v1/posts/", params=next(feed_params), headers=auth_headers
+        )
+        latency = time.perf_counter() - before
+        assert response.status_code == 200
+        assert response.json()["posts"]
+        if saturated and gemini_service._gemini_semaphore.locked():
+            feed_latencies.append(latency)
+        await asyncio.sleep(0.01)
+
+    responses = await scans
+    elapsed = time.perf_counter() - started
+
+    assert [r.status_code for r in responses] == [200] * CONCURRENT_SCANS
+    assert model.calls == CONCURRENT_SCANS
+    # Serial calls would take CONCURRENT_SCANS * MODEL_LATENCY_SECONDS
+    assert elapsed < CONCURRENT_SCANS * MODEL_LATENCY_SECONDS / 2
+    # Only requests made entirely while every Gemini slot was held count; enough of them
+    # that p99 is not just the slowest one (a full GC pause is ~0.2s here)
+    assert len(feed_latencies) >= 100, len(feed_latencies)
+    p99 = statistics.quantiles(feed_latencies, n=100, method="inclusive")[98]
+    assert p99 < MAX_FEED_P99_SECONDS, sorted(feed_latencies)[-5:]
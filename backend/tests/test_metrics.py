@@ -0,0 +1,24 @@
+"""/metrics is only served with METRICS_TOKEN set, and only to that bearer token"""
+import pytest
+
+from app.config import settings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_metrics_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    response = await client.get("/metrics")
+    assert response.status_code == 404
+
+
+async def test_metrics_requires_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+
+    assert (await client.get("/metrics")).status_code == 401
+    wrong = await client.get("/metrics", headers={"Authorization": "Bearer nope"})
+    assert wrong.status_code == 401
+
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert "db_query_seconds" in response.text
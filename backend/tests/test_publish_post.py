@@ -0,0 +1,50 @@
+"""Publishing a post: files stored for a post that never commits must not stay in storage"""
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from app.config import settings
+from app.services import post_service
+
+pytestmark = pytest.mark.anyio
+
+
+def stored_files() -> set[str]:
+    return {
+        os.path.join(root, name)
+        for directory in (settings.UPLOAD_DIR, settings.UPLOAD_STAGING_DIR)
+        for root, _, names in os.walk(directory)
+        for name in names
+    }
+
+
+def noise_jpeg() -> bytes:
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", (400, 300), os.urandom(400 * 300 * 3)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+async def test_failed_post_removes_published_renditions(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "SCAN_ANALYZER", "stub")
+    create_post_with_scan = post_service.create_post_with_scan
+    published = []
+
+    async def failing_create(db, user_id, image_url, description, image_scan, image_variants=None):
+        published.extend([image_url, *image_variants.values()])
+        await create_post_with_scan(db, user_id, image_url, description, image_scan, image_variants)
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(post_service, "create_post_with_scan", failing_create)
+    before = stored_files()
+
+    with pytest.raises(RuntimeError, match="database went away"):
+        await client.post(
+            "/api/v1/posts/",
+            files={"image": ("scam.jpg", noise_jpeg(), "image/jpeg")},
+            headers=auth_headers,
+        )
+
+    assert len(published) > 1  # the original and its renditions were stored
+    assert stored_files() == before
@@ -0,0 +1,54 @@
+"""Every scan entry point honors SCAN_ANALYZER, not only the job queue"""
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from app.config import settings
+from app.services import gemini_service
+
+pytestmark = pytest.mark.anyio
+
+
+def noise_png() -> bytes:
+    buffer = io.BytesIO()
+    Image.frombytes("L", (64, 64), os.urandom(64 * 64)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def stub_analyzer(monkeypatch):
+    """SCAN_ANALYZER=stub with a Gemini key configured; returns the model calls made"""
+    calls = []
+
+    def get_gemini_model():
+        calls.append("model")
+        raise RuntimeError("Gemini called with SCAN_ANALYZER=stub")
+
+    monkeypatch.setattr(settings, "SCAN_ANALYZER", "stub")
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(gemini_service, "get_gemini_model", get_gemini_model)
+    return calls
+
+
+async def test_analyze_json_uses_stub(client, auth_headers, stub_analyzer):
+    image_data = base64.b64encode(noise_png()).decode()
+    response = await client.post(
+        "/api/v1/posts/analyze-json",
+        json={"image_data": image_data, "mime_type": "image/png"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["scan_result"]["analysis"] == gemini_service.get_mock_scan_result().analysis
+    assert stub_analyzer == []
+
+
+async def test_analyze_and_create_post_use_stub(client, auth_headers, stub_analyzer):
+    files = {"image": ("scam.png", noise_png(), "image/png")}
+    assert (await client.post("/api/v1/posts/analyze", files=files, headers=auth_headers)).status_code == 200
+
+    files = {"image": ("scam.png", noise_png(), "image/png")}
+    assert (await client.post("/api/v1/posts/", files=files, headers=auth_headers)).status_code == 201
+    assert stub_analyzer == []
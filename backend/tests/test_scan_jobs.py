@@ -0,0 +1,136 @@
+"""Scan job queue: submit -> worker -> done/failed with stub analyzers, and recovery of lost jobs"""
+import asyncio
+import base64
+import io
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from PIL import Image
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import ScanJob
+from app.services import scan_jobs
+from app.services.gemini_service import ScanResultData, GeminiBusyError
+from app.services.image_ingest import stage_base64
+from app.services.scan_jobs import ScanJobQueue
+
+pytestmark = pytest.mark.anyio
+
+SAFE_RESULT = ScanResultData(
+    is_scam=False, confidence_score=10, scam_type="안전", risk_level="LOW", extracted_tags=[], analysis="stub"
+)
+
+
+def noise_png() -> str:
+    buffer = io.BytesIO()
+    Image.frombytes("L", (64, 64), os.urandom(64 * 64)).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+@pytest.fixture
+async def user_id(client, auth_headers):
+    return (await client.get("/api/v1/auth/me", headers=auth_headers)).json()["id"]
+
+
+async def run_job(user_id, analyzer):
+    queue = ScanJobQueue(analyzer=analyzer)
+    await queue.start(num_workers=1)
+    try:
+        job = await queue.submit(user_id, await stage_base64(noise_png(), "image/png"))
+        await queue.wait(job.id, 10)
+    finally:
+        await queue.stop()
+    # As another worker would see it
+    return await ScanJobQueue().get(job.id)
+
+
+async def test_job_done(user_id):
+    async def analyzer(image_bytes, mime_type):
+        return SAFE_RESULT
+
+    job = await run_job(user_id, analyzer)
+    assert job.status == "done"
+    assert job.scan_result == SAFE_RESULT
+    assert job.post_id is None
+
+
+async def test_job_failed(user_id):
+    async def analyzer(image_bytes, mime_type):
+        raise RuntimeError("model exploded")
+
+    job = await run_job(user_id, analyzer)
+    assert job.status == "failed"
+    assert "model exploded" in job.error
+
+
+async def test_busy_retries_are_capped(user_id, monkeypatch):
+    monkeypatch.setattr(settings, "SCAN_JOB_MAX_BUSY_RETRIES", 2)
+    monkeypatch.setattr(scan_jobs, "BUSY_RETRY_SECONDS", 0)
+    attempts = []
+
+    async def analyzer(image_bytes, mime_type):
+        attempts.append(1)
+        raise GeminiBusyError()
+
+    job = await run_job(user_id, analyzer)
+    assert job.status == "failed"
+    assert job.error == scan_jobs.BUSY_ERROR
+    assert len(attempts) == 3
+
+
+async def test_stop_fails_unfinished_jobs(user_id):
+    async def analyzer(image_bytes, mime_type):
+        await asyncio.Event().wait()
+
+    queue = ScanJobQueue(analyzer=analyzer)
+    await queue.start(num_workers=1)
+    running = await queue.submit(user_id, await stage_base64(noise_png(), "image/png"))
+    queued = await queue.submit(user_id, await stage_base64(noise_png(), "image/png"))
+    await asyncio.sleep(0.2)
+    await queue.stop()
+
+    for job_id in (running.id, queued.id):
+        job = await ScanJobQueue().get(job_id)
+        assert job.status == "failed"
+        assert job.error == scan_jobs.LOST_ERROR
+
+
+async def test_stale_jobs_are_failed_on_start_and_read(user_id):
+    old = datetime.utcnow() - timedelta(seconds=settings.SCAN_JOB_STALE_SECONDS + 60)
+    async with AsyncSessionLocal() as db:
+        db.add_all([
+            ScanJob(id="stale-queued", user_id=user_id, status="queued", created_at=old),
+            ScanJob(id="stale-running", user_id=user_id, status="running", created_at=old),
+            ScanJob(id="fresh-queued", user_id=user_id, status="queued", created_at=datetime.utcnow()),
+        ])
+        await db.commit()
+
+    queue = ScanJobQueue()
+    await queue.start(num_workers=1)
+    await queue.stop()
+
+    assert (await queue.get("stale-queued")).status == "failed"
+    assert (await queue.get("stale-running")).error == scan_jobs.LOST_ERROR
+    assert (await queue.get("fresh-queued")).status == "queued"
+
+    # A job lost after startup is failed when it is read
+    async with AsyncSessionLocal() as db:
+        (await db.get(ScanJob, "fresh-queued")).created_at = old
+        await db.commit()
+    assert (await ScanJobQueue().wait("fresh-queued", 5)).status == "failed"
+
+
+async def test_scan_job_api_with_stub_analyzer(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "SCAN_ANALYZER", "stub")
+    response = await client.post(
+        "/api/v1/scan-jobs/", json={"image_data": noise_png(), "mime_type": "image/png"}, headers=auth_headers
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    response = await client.get(f"/api/v1/scan-jobs/{job_id}", params={"wait": 10}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "done"
+    assert response.json()["scan_result"]["analysis"]